@@ -0,0 +1,119 @@
+import copy
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+
+from .nlp_pipeline import PIPELINE_VERSION, ResumeDocument, compute_signals, detect_resume_document
+
+
+ANALYSIS_CACHE_SIZE = int(os.getenv("ANALYSIS_CACHE_SIZE", "512"))
+ANALYSIS_CACHE_TTL_SECONDS = float(os.getenv("ANALYSIS_CACHE_TTL_SECONDS", "3600"))
+
+
+class AnalysisMemo:
+    """Thread-safe LRU memo with a time-to-live; values are deep-copied in and out."""
+
+    def __init__(self, max_entries: int = ANALYSIS_CACHE_SIZE, ttl_seconds: float = ANALYSIS_CACHE_TTL_SECONDS):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: OrderedDict[tuple, tuple[float, object]] = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: tuple):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and self.ttl_seconds > 0 and time.monotonic() - entry[0] > self.ttl_seconds:
+                del self._entries[key]
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            value = entry[1]
+        return copy.deepcopy(value)
+
+    def put(self, key: tuple, value) -> None:
+        if self.max_entries <= 0:
+            return
+        value = copy.deepcopy(value)
+        with self._lock:
+            self._entries[key] = (time.monotonic(), value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.misses = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "ttl_seconds": self.ttl_seconds,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+            }
+
+
+_signals_memo = AnalysisMemo()
+_document_check_memo = AnalysisMemo()
+
+
+def _text_of(source: str | ResumeDocument) -> str:
+    return source.text if isinstance(source, ResumeDocument) else source
+
+
+def _digest(value: str) -> str:
+    return hashlib.sha256(value.encode("utf-8", "surrogatepass")).hexdigest()
+
+
+def _facts_digest(facts: dict | None) -> str:
+    return _digest(json.dumps(facts or {}, sort_keys=True, default=str, separators=(",", ":")))
+
+
+def cached_compute_signals(
+    resume_text: str | ResumeDocument,
+    target_role: str,
+    filename: str = "",
+    facts: dict | None = None,
+    document: ResumeDocument | None = None,
+) -> dict:
+    key = (PIPELINE_VERSION, _digest(_text_of(resume_text)), target_role, filename, _facts_digest(facts))
+    result = _signals_memo.get(key)
+    if result is None:
+        result = compute_signals(resume_text, target_role, filename=filename, facts=facts, document=document)
+        _signals_memo.put(key, result)
+    return result
+
+
+def cached_detect_resume_document(text: str | ResumeDocument) -> dict:
+    key = (PIPELINE_VERSION, _digest(_text_of(text)))
+    result = _document_check_memo.get(key)
+    if result is None:
+        result = detect_resume_document(text)
+        _document_check_memo.put(key, result)
+    return result
+
+
+def analysis_cache_stats() -> dict:
+    return {
+        "pipeline_version": PIPELINE_VERSION,
+        "compute_signals": _signals_memo.stats(),
+        "detect_resume_document": _document_check_memo.stats(),
+    }
+
+
+def clear_analysis_cache() -> None:
+    _signals_memo.clear()
+    _document_check_memo.clear()
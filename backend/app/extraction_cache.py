@@ -0,0 +1,89 @@
+import os
+from datetime import datetime
+
+from sqlalchemy import func
+from sqlalchemy.exc import IntegrityError
+
+from .db import SessionLocal
+from .models import ExtractionCacheEntry
+from .resume_parser import EXTRACTOR_VERSION
+
+
+EXTRACTION_CACHE_ENABLED = os.getenv("EXTRACTION_CACHE_ENABLED", "1").lower() not in {"0", "false", "no"}
+EXTRACTION_CACHE_MAX_BYTES = int(os.getenv("EXTRACTION_CACHE_MAX_BYTES", str(256 * 1024 * 1024)))
+
+
+def _cacheable(result: dict) -> bool:
+    # A result produced while Tesseract was missing would hide OCR text once it is installed,
+    # and a truncated result depends on the budget that was in force.
+    if result.get("truncated") or result.get("rejected_early"):
+        return False
+    return bool(result.get("text", "").strip()) and result.get("ocr_available") is not False
+
+
+def get_cached_extraction(digest: str) -> dict | None:
+    if not EXTRACTION_CACHE_ENABLED:
+        return None
+
+    with SessionLocal() as session:
+        entry = (
+            session.query(ExtractionCacheEntry)
+            .filter(
+                ExtractionCacheEntry.content_sha256 == digest,
+                ExtractionCacheEntry.extractor_version == EXTRACTOR_VERSION,
+            )
+            .one_or_none()
+        )
+        if entry is None:
+            return None
+        entry.last_used_at = datetime.utcnow()
+        result = dict(entry.result_json)
+        session.commit()
+    return result
+
+
+def store_extraction(digest: str, result: dict) -> None:
+    if not EXTRACTION_CACHE_ENABLED or not _cacheable(result):
+        return
+
+    size_bytes = len(result.get("text", "").encode("utf-8")) + sum(
+        len(text.encode("utf-8")) for text in result.get("ocr_text", {}).values()
+    )
+    with SessionLocal() as session:
+        session.add(
+            ExtractionCacheEntry(
+                content_sha256=digest,
+                extractor_version=EXTRACTOR_VERSION,
+                result_json=result,
+                size_bytes=size_bytes,
+            )
+        )
+        try:
+            session.commit()
+        except IntegrityError:
+            # Another request stored the same file first.
+            session.rollback()
+            return
+        _evict(session)
+
+
+def _evict(session) -> None:
+    total = session.query(func.coalesce(func.sum(ExtractionCacheEntry.size_bytes), 0)).scalar() or 0
+    if total <= EXTRACTION_CACHE_MAX_BYTES:
+        return
+
+    oldest = (
+        session.query(ExtractionCacheEntry.id, ExtractionCacheEntry.size_bytes)
+        .order_by(ExtractionCacheEntry.last_used_at.asc(), ExtractionCacheEntry.id.asc())
+        .yield_per(200)
+    )
+    stale_ids = []
+    for entry_id, size_bytes in oldest:
+        if total <= EXTRACTION_CACHE_MAX_BYTES:
+            break
+        stale_ids.append(entry_id)
+        total -= size_bytes
+
+    if stale_ids:
+        session.query(ExtractionCacheEntry).filter(ExtractionCacheEntry.id.in_(stale_ids)).delete(synchronize_session=False)
+        session.commit()
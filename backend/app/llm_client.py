@@ -2,6 +2,8 @@ import os
 
 import httpx
 
+from .timing import timed
+
 
 def _score_band(value: float) -> str:
     if value >= 0.8:
@@ -117,6 +119,7 @@ def resume_cleanup_http(resume_text: str, filename: str) -> dict:
     }
 
 
+@timed("llm.cleanup")
 def clean_resume_text_with_llm(resume_text: str, filename: str) -> dict:
     mode = os.getenv("LLM_MODE", "stub").lower()
     if mode == "http":
@@ -167,6 +170,7 @@ def document_classifier_http(text: str, filename: str) -> dict:
     }
 
 
+@timed("llm.classify")
 def classify_document_with_llm(text: str, filename: str) -> dict:
     mode = os.getenv("LLM_MODE", "stub").lower()
     if mode == "http":
@@ -174,6 +178,7 @@ def classify_document_with_llm(text: str, filename: str) -> dict:
     return document_classifier_stub(text, filename)
 
 
+@timed("llm.review")
 def generate_llm_review(profile: dict, resume_text: str) -> dict:
     mode = os.getenv("LLM_MODE", "stub").lower()
     if mode == "http":
@@ -1,15 +1,29 @@
 import os
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
 
 from .db import Base, engine
 from . import models  # noqa: F401
+from .migrations import run_migrations
+from .ocr import shutdown_ocr_executor, start_ocr_service
 from .routes import router
+from .uploads import UploadLimitMiddleware
 
 Base.metadata.create_all(bind=engine)
+run_migrations(engine)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    start_ocr_service()
+    yield
+    shutdown_ocr_executor()
+
 
-app = FastAPI(title="InternOS API", version="0.2.0")
+app = FastAPI(title="InternOS API", version="0.2.0", lifespan=lifespan)
 
 app.add_middleware(
     CORSMiddleware,
@@ -18,6 +32,7 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+app.add_middleware(UploadLimitMiddleware)
 
 ARTIFACTS_DIR = os.getenv("ARTIFACTS_DIR", "./artifacts")
 os.makedirs(ARTIFACTS_DIR, exist_ok=True)
@@ -0,0 +1,174 @@
+import json
+
+from sqlalchemy import inspect, text
+from sqlalchemy.exc import OperationalError
+
+from .search_index import (
+    FTS_CREATE,
+    FTS_TABLE,
+    fts_insert_statement,
+    fts_row,
+    resume_skill_names,
+    resume_summary,
+    search_columns,
+)
+
+
+# create_all() only creates missing tables, so columns added to existing tables are applied here.
+# Every migration must be safe to run on each startup.
+
+
+def _json_value(value):
+    return json.loads(value) if isinstance(value, str) else value
+
+
+def _add_column(connection, table: str, column: str, ddl: str) -> None:
+    existing = {item["name"] for item in inspect(connection).get_columns(table)}
+    if column not in existing:
+        connection.execute(text(f"ALTER TABLE {table} ADD COLUMN {column} {ddl}"))
+
+
+def _resume_content_hash(connection) -> None:
+    _add_column(connection, "resumes", "content_sha256", "VARCHAR(64)")
+    _add_column(connection, "resumes", "target_role", "VARCHAR")
+    connection.execute(
+        text(
+            "CREATE INDEX IF NOT EXISTS ix_resumes_content_sha256_target_role "
+            "ON resumes (content_sha256, target_role)"
+        )
+    )
+
+
+def _resume_search_columns(connection) -> None:
+    _add_column(connection, "resumes", "degrees", "VARCHAR")
+    _add_column(connection, "resumes", "graduated", "BOOLEAN")
+    _add_column(connection, "resumes", "graduation_year", "INTEGER")
+    _add_column(connection, "resumes", "overall_score", "FLOAT")
+    connection.execute(
+        text("CREATE INDEX IF NOT EXISTS ix_resumes_graduated_overall_score ON resumes (graduated, overall_score)")
+    )
+    connection.execute(text("CREATE INDEX IF NOT EXISTS ix_resumes_overall_score ON resumes (overall_score)"))
+
+    # Backfill rows stored before the columns existed; new rows are indexed when they are saved.
+    last_id = 0
+    while True:
+        rows = connection.execute(
+            text(
+                "SELECT id, nlp_json FROM resumes "
+                "WHERE overall_score IS NULL AND id > :last_id ORDER BY id LIMIT 500"
+            ),
+            {"last_id": last_id},
+        ).all()
+        if not rows:
+            break
+        profiles = [(resume_id, _json_value(nlp)) for resume_id, nlp in rows]
+        connection.execute(
+            text(
+                "UPDATE resumes SET degrees = :degrees, graduated = :graduated, "
+                "graduation_year = :graduation_year, overall_score = :overall_score WHERE id = :id"
+            ),
+            [{**search_columns(nlp), "id": resume_id} for resume_id, nlp in profiles],
+        )
+        connection.execute(
+            text("DELETE FROM resume_skills WHERE resume_id = :id"),
+            [{"id": resume_id} for resume_id, _ in profiles],
+        )
+        skills = [
+            {"resume_id": resume_id, "skill": skill}
+            for resume_id, nlp in profiles
+            for skill in resume_skill_names(nlp)
+        ]
+        if skills:
+            connection.execute(
+                text("INSERT INTO resume_skills (resume_id, skill) VALUES (:resume_id, :skill)"), skills
+            )
+        last_id = rows[-1][0]
+
+
+def _user_latest_resume(connection) -> None:
+    _add_column(connection, "users", "latest_resume_id", "INTEGER REFERENCES resumes (id)")
+    connection.execute(text("CREATE INDEX IF NOT EXISTS ix_users_latest_resume_id ON users (latest_resume_id)"))
+    connection.execute(
+        text(
+            "UPDATE users SET latest_resume_id = "
+            "(SELECT MAX(resumes.id) FROM resumes WHERE resumes.user_id = users.id) "
+            "WHERE latest_resume_id IS NULL"
+        )
+    )
+
+
+def _resume_fts(connection) -> None:
+    if connection.dialect.name != "sqlite" or inspect(connection).has_table(FTS_TABLE):
+        return
+    try:
+        connection.execute(text(FTS_CREATE))
+    except OperationalError:
+        # SQLite was built without FTS5; /resumes/find falls back to matching in Python.
+        return
+
+    # The table is new, so every stored resume is indexed exactly once; later rows are added on upload.
+    last_id = 0
+    while True:
+        rows = connection.execute(
+            text(
+                "SELECT resumes.id, users.handle, resumes.filename, resumes.text, resumes.nlp_json "
+                "FROM resumes JOIN users ON users.id = resumes.user_id "
+                "WHERE resumes.id > :last_id ORDER BY resumes.id LIMIT 500"
+            ),
+            {"last_id": last_id},
+        ).all()
+        if not rows:
+            break
+        connection.execute(
+            fts_insert_statement(),
+            [
+                fts_row(resume_id, handle, filename, body, _json_value(nlp))
+                for resume_id, handle, filename, body, nlp in rows
+            ],
+        )
+        last_id = rows[-1][0]
+
+
+def _resume_summary(connection) -> None:
+    _add_column(connection, "resumes", "summary_json", "JSON")
+    last_id = 0
+    while True:
+        rows = connection.execute(
+            text(
+                "SELECT id, nlp_json, llm_json FROM resumes "
+                "WHERE summary_json IS NULL AND id > :last_id ORDER BY id LIMIT 500"
+            ),
+            {"last_id": last_id},
+        ).all()
+        if not rows:
+            break
+        connection.execute(
+            text("UPDATE resumes SET summary_json = :summary WHERE id = :id"),
+            [
+                {"summary": json.dumps(resume_summary(_json_value(nlp), _json_value(llm))), "id": resume_id}
+                for resume_id, nlp, llm in rows
+            ],
+        )
+        last_id = rows[-1][0]
+
+
+def _resume_versions(connection) -> None:
+    # Rows stored before the versions were recorded are left NULL, so they are never reused.
+    _add_column(connection, "resumes", "pipeline_version", "VARCHAR")
+    _add_column(connection, "resumes", "extractor_version", "VARCHAR")
+
+
+MIGRATIONS = [
+    _resume_content_hash,
+    _resume_search_columns,
+    _user_latest_resume,
+    _resume_fts,
+    _resume_summary,
+    _resume_versions,
+]
+
+
+def run_migrations(engine) -> None:
+    with engine.begin() as connection:
+        for migration in MIGRATIONS:
+            migration(connection)
@@ -1,7 +1,7 @@
 from datetime import datetime
 
-from sqlalchemy import Column, DateTime, ForeignKey, Integer, JSON, String, Text
-from sqlalchemy.orm import relationship
+from sqlalchemy import Boolean, Column, DateTime, Float, ForeignKey, Index, Integer, JSON, String, Text, UniqueConstraint
+from sqlalchemy.orm import deferred, relationship
 
 from .db import Base
 
@@ -11,18 +11,66 @@ class User(Base):
 
     id = Column(Integer, primary_key=True)
     handle = Column(String, unique=True, index=True, nullable=False)
-    resumes = relationship("Resume", back_populates="user", cascade="all, delete-orphan")
+    # Maintained by analyze_resume so "latest resume per candidate" is a plain indexed join.
+    latest_resume_id = Column(
+        Integer,
+        ForeignKey("resumes.id", use_alter=True, name="fk_users_latest_resume_id"),
+        nullable=True,
+        index=True,
+    )
+    resumes = relationship("Resume", back_populates="user", cascade="all, delete-orphan", foreign_keys="Resume.user_id")
+    latest_resume = relationship("Resume", foreign_keys=[latest_resume_id], post_update=True)
 
 
 class Resume(Base):
     __tablename__ = "resumes"
+    __table_args__ = (
+        Index("ix_resumes_content_sha256_target_role", "content_sha256", "target_role"),
+        Index("ix_resumes_graduated_overall_score", "graduated", "overall_score"),
+        Index("ix_resumes_overall_score", "overall_score"),
+    )
 
     id = Column(Integer, primary_key=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
     filename = Column(String, nullable=False)
-    text = Column(Text, nullable=False)
+    content_sha256 = Column(String(64), nullable=True)
+    target_role = Column(String, nullable=True)
+    # Versions the analysis was produced with; a re-upload is only reused while both are current.
+    pipeline_version = Column(String, nullable=True)
+    extractor_version = Column(String, nullable=True)
+    # The full body is only needed to re-score or re-index; listings never load it.
+    text = deferred(Column(Text, nullable=False))
     nlp_json = Column(JSON, nullable=False)
     llm_json = Column(JSON, nullable=False)
     created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    # Searchable facts copied out of nlp_json when the resume is stored.
+    degrees = Column(String, nullable=True)
+    graduated = Column(Boolean, nullable=True)
+    graduation_year = Column(Integer, nullable=True)
+    overall_score = Column(Float, nullable=True)
+    # The ResumeSearchResult fields, so listings can skip the full nlp_json and llm_json.
+    summary_json = Column(JSON, nullable=True)
 
-    user = relationship("User", back_populates="resumes")
+    user = relationship("User", back_populates="resumes", foreign_keys=[user_id])
+    skills = relationship("ResumeSkill", cascade="all, delete-orphan", passive_deletes=True)
+
+
+class ResumeSkill(Base):
+    __tablename__ = "resume_skills"
+    __table_args__ = (Index("ix_resume_skills_skill_resume_id", "skill", "resume_id"),)
+
+    resume_id = Column(Integer, ForeignKey("resumes.id", ondelete="CASCADE"), primary_key=True)
+    skill = Column(String, primary_key=True)
+
+
+class ExtractionCacheEntry(Base):
+    __tablename__ = "extraction_cache"
+    __table_args__ = (UniqueConstraint("content_sha256", "extractor_version", name="uq_extraction_cache_key"),)
+
+    id = Column(Integer, primary_key=True)
+    content_sha256 = Column(String(64), nullable=False)
+    extractor_version = Column(String, nullable=False)
+    result_json = Column(JSON, nullable=False)
+    size_bytes = Column(Integer, nullable=False)
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    last_used_at = Column(DateTime, default=datetime.utcnow, nullable=False, index=True)
@@ -1,6 +1,20 @@
+import os
 import re
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
+from functools import cached_property
+from itertools import islice
+from multiprocessing import get_context
+from typing import Iterable, Iterator, NamedTuple
 
+from .phrase_matcher import PhraseHit, PhraseMatcher
+from .scoring import score_features
+from .timing import stage
+
+
+# Bump whenever extractors, keyword tables or scoring weights change so memoized analyses are not reused.
+PIPELINE_VERSION = "3"
 
 ACTION_VERBS = [
     "built", "developed", "implemented", "designed", "optimized", "improved", "reduced", "increased",
@@ -65,65 +79,71 @@ SECTION_PATTERNS = {
     "skills": r"\b(skills|technologies|tools)\b",
     "certifications": r"\b(certifications|certificates)\b",
 }
+SECTION_RES = {key: re.compile(pattern) for key, pattern in SECTION_PATTERNS.items()}
+SECTION_HEADING_MAX_WORDS = 4
+SECTION_OTHER = "other"
 
 SKILL_PATTERNS = {
-    "aws": [r"\baws\b", r"\bamazon web services\b"],
-    "api": [r"\bapi\b", r"\bapis\b"],
-    "azure": [r"\bazure\b"],
-    "bash": [r"\bbash\b", r"\bshell scripting\b"],
-    "c": [r"(?<!\+)\bc\b(?!\+)"],
-    "c#": [r"\bc#\b", r"\bc sharp\b"],
-    "c++": [r"\bc\+\+\b"],
-    "ci/cd": [r"\bci/cd\b", r"\bcontinuous integration\b", r"\bcontinuous deployment\b"],
-    "css": [r"\bcss\b"],
-    "data analysis": [r"\bdata analysis\b", r"\bdata analytics\b"],
-    "data structures": [r"\bdata structures\b"],
-    "django": [r"\bdjango\b"],
-    "docker": [r"\bdocker\b"],
-    "etl": [r"\betl\b"],
-    "express": [r"\bexpress(?:\.js)?\b"],
-    "figma": [r"\bfigma\b"],
-    "fastapi": [r"\bfastapi\b"],
-    "flask": [r"\bflask\b"],
-    "gitlab": [r"\bgitlab\b"],
-    "gcp": [r"\bgcp\b", r"\bgoogle cloud\b"],
-    "git": [r"\bgit\b", r"\bgithub\b"],
-    "go": [r"\bgolang\b"],
-    "graphql": [r"\bgraphql\b"],
-    "html": [r"\bhtml\b"],
-    "java": [r"\bjava\b", r"\bcore java\b"],
-    "javascript": [r"\bjavascript\b"],
-    "jira": [r"\bjira\b"],
-    "jest": [r"\bjest\b"],
-    "linux": [r"\blinux\b", r"\bunix\b"],
-    "kubernetes": [r"\bkubernetes\b", r"\bk8s\b"],
-    "machine learning": [r"\bmachine learning\b", r"\bml\b"],
-    "mongodb": [r"\bmongodb\b", r"\bmongo\b"],
-    "mysql": [r"\bmysql\b"],
-    "next.js": [r"\bnext\.?js\b"],
-    "node.js": [r"\bnode\.?js\b", r"\bnodejs\b"],
-    "numpy": [r"\bnumpy\b"],
-    "oop": [r"\boop\b", r"\bobject oriented\b", r"\bobject-oriented\b"],
-    "pandas": [r"\bpandas\b"],
-    "postgres": [r"\bpostgres\b", r"\bpostgresql\b"],
-    "python": [r"\bpython\b"],
-    "pytorch": [r"\bpytorch\b"],
-    "react": [r"\breact\b"],
-    "redis": [r"\bredis\b"],
-    "redux": [r"\bredux\b"],
-    "rest": [r"\brest\b", r"\brest api\b"],
-    "scikit-learn": [r"\bscikit-learn\b", r"\bsklearn\b"],
-    "selenium": [r"\bselenium\b"],
-    "spring": [r"\bspring\b", r"\bspring boot\b"],
-    "sql": [r"\bsql\b"],
-    "tableau": [r"\btableau\b"],
-    "terraform": [r"\bterraform\b"],
-    "tensorflow": [r"\btensorflow\b"],
-    "testing": [r"\btesting\b", r"\bunit test(?:ing)?\b"],
-    "typescript": [r"\btypescript\b"],
-    "ui/ux": [r"\bui/ux\b", r"\buser experience\b", r"\buser interface\b"],
-    "webpack": [r"\bwebpack\b"],
+    "aws": ["aws", "amazon web services"],
+    "api": ["api", "apis"],
+    "azure": ["azure"],
+    "bash": ["bash", "shell scripting"],
+    "c": ["c"],
+    "c#": ["c#", "c sharp"],
+    "c++": ["c++"],
+    "ci/cd": ["ci/cd", "continuous integration", "continuous deployment"],
+    "css": ["css"],
+    "data analysis": ["data analysis", "data analytics"],
+    "data structures": ["data structures"],
+    "django": ["django"],
+    "docker": ["docker"],
+    "etl": ["etl"],
+    "express": ["express", "express.js"],
+    "figma": ["figma"],
+    "fastapi": ["fastapi"],
+    "flask": ["flask"],
+    "gitlab": ["gitlab"],
+    "gcp": ["gcp", "google cloud"],
+    "git": ["git", "github"],
+    "go": ["golang"],
+    "graphql": ["graphql"],
+    "html": ["html"],
+    "java": ["java", "core java"],
+    "javascript": ["javascript"],
+    "jira": ["jira"],
+    "jest": ["jest"],
+    "linux": ["linux", "unix"],
+    "kubernetes": ["kubernetes", "k8s"],
+    "machine learning": ["machine learning", "ml"],
+    "mongodb": ["mongodb", "mongo"],
+    "mysql": ["mysql"],
+    "next.js": ["next.js", "nextjs"],
+    "node.js": ["node.js", "nodejs"],
+    "numpy": ["numpy"],
+    "oop": ["oop", "object oriented", "object-oriented"],
+    "pandas": ["pandas"],
+    "postgres": ["postgres", "postgresql"],
+    "python": ["python"],
+    "pytorch": ["pytorch"],
+    "react": ["react"],
+    "redis": ["redis"],
+    "redux": ["redux"],
+    "rest": ["rest", "rest api"],
+    "scikit-learn": ["scikit-learn", "sklearn"],
+    "selenium": ["selenium"],
+    "spring": ["spring", "spring boot"],
+    "sql": ["sql"],
+    "tableau": ["tableau"],
+    "terraform": ["terraform"],
+    "tensorflow": ["tensorflow"],
+    "testing": ["testing", "unit test", "unit testing"],
+    "typescript": ["typescript"],
+    "ui/ux": ["ui/ux", "user experience", "user interface"],
+    "webpack": ["webpack"],
 }
+# "c" must not touch a "+" so that "c++" and "c+" are not read as C.
+SKILL_PATTERN_GUARDS = {"c": "+"}
+SKILL_MATCHER = PhraseMatcher(SKILL_PATTERNS, guards=SKILL_PATTERN_GUARDS)
 
 SKILL_ALIASES = {
     "amazon web services": "aws",
@@ -209,6 +229,19 @@ SKILL_ALIASES = {
     "webpack": "webpack",
 }
 
+
+def _role_keyword_phrases(keyword: str) -> list[str]:
+    canonical = SKILL_ALIASES.get(keyword, keyword)
+    return list(dict.fromkeys([keyword, *SKILL_PATTERNS.get(canonical, [])]))
+
+
+# Inverted index from each role keyword to the roles that ask for it, so one scan scores every role.
+ROLE_KEYWORD_ROLES: dict[str, list[str]] = {}
+for _role, _profile in ROLE_PROFILES.items():
+    for _keyword in _profile["keywords"]:
+        ROLE_KEYWORD_ROLES.setdefault(_keyword, []).append(_role)
+ROLE_KEYWORD_MATCHER = PhraseMatcher({keyword: _role_keyword_phrases(keyword) for keyword in ROLE_KEYWORD_ROLES})
+
 SKILL_SECTION_STOPWORDS = {
     "skills", "technical skills", "technologies", "tools", "frameworks", "languages",
     "coursework", "education", "experience", "projects", "summary", "profile",
@@ -336,6 +369,7 @@ EDUCATION_CONTEXT_RE = re.compile(
 )
 URL_RE = re.compile(r"(https?://\S+|www\.\S+)", re.IGNORECASE)
 EMAIL_RE = re.compile(r"\b[\w\.-]+@[\w\.-]+\.\w+\b")
+BULLET_PREFIX_RE = re.compile(r"^(-|•|\*|\d+\.)\s*")
 NUMBER_RE = re.compile(r"(\d+(\.\d+)?)(%|ms|s|x|k|m|usd|\$)?", re.IGNORECASE)
 YEAR_RE = re.compile(r"\b(19\d{2}|20\d{2})\b")
 NAME_TOKEN_RE = re.compile(r"^[A-Za-z][A-Za-z'`.-]*$")
@@ -351,20 +385,172 @@ NEGATIVE_DOC_PATTERNS = {
 }
 
 
-def detect_sections(text: str) -> dict:
-    t = text.lower()
-    present = {}
-    for key, pattern in SECTION_PATTERNS.items():
-        present[key] = bool(re.search(pattern, t))
-    return present
+class ResumeDocument:
+    """Resume text tokenized once and shared by every extractor in the pipeline."""
+
+    def __init__(self, text: str):
+        self.text = text
+
+    @cached_property
+    def lower(self) -> str:
+        return self.text.lower()
+
+    @cached_property
+    def lines(self) -> list[str]:
+        return [line.strip() for line in self.text.splitlines() if line.strip()]
+
+    @cached_property
+    def lower_lines(self) -> list[str]:
+        return [line.lower() for line in self.lines]
+
+    @cached_property
+    def bullet_lines(self) -> list[int]:
+        return [
+            index for index, line in enumerate(self.lines)
+            if line.startswith(("-", "•", "*")) or re.match(r"^\d+\.", line)
+        ]
+
+    @cached_property
+    def bullets(self) -> list[str]:
+        return [BULLET_PREFIX_RE.sub("", self.lines[index]).strip() for index in self.bullet_lines]
+
+    @cached_property
+    def role_keywords(self) -> set[str]:
+        return ROLE_KEYWORD_MATCHER.labels(self.lower)
+
+    @cached_property
+    def segmentation(self) -> "Segmentation":
+        return segment_sections(self)
+
+    @property
+    def sections(self) -> list["Section"]:
+        return self.segmentation.sections
+
+    def section_lines(self, label: str) -> list[int]:
+        return [
+            index
+            for section in self.segmentation.sections if section.label == label
+            for index in range(section.start, section.end)
+        ]
 
+    @cached_property
+    def email_matches(self) -> list[re.Match]:
+        return list(EMAIL_RE.finditer(self.text))
 
-def detect_resume_document(text: str) -> dict:
-    lower = text.lower()
-    sections = detect_sections(text)
-    emails = EMAIL_RE.findall(text)
-    years = YEAR_RE.findall(text)
-    bullets = split_bullets(text)
+    @cached_property
+    def year_matches(self) -> list[re.Match]:
+        return list(YEAR_RE.finditer(self.text))
+
+    @cached_property
+    def url_matches(self) -> list[re.Match]:
+        return list(URL_RE.finditer(self.text))
+
+    @property
+    def emails(self) -> list[str]:
+        return [match.group(0) for match in self.email_matches]
+
+    @property
+    def years(self) -> list[str]:
+        return [match.group(0) for match in self.year_matches]
+
+    @property
+    def urls(self) -> list[str]:
+        return [match.group(0) for match in self.url_matches]
+
+
+class Section(NamedTuple):
+    label: str
+    start: int
+    end: int
+
+
+class Segmentation(NamedTuple):
+    labels: list[str]
+    sections: list[Section]
+    headings: set[int]
+    mentions: set[str]
+
+
+def _section_heading(line: str, lower: str) -> str | None:
+    head = lower.split(":", 1)[0] if ":" in lower else lower
+    head = head.strip(" .:-|•*#")
+    if not head or len(head.split()) > SECTION_HEADING_MAX_WORDS:
+        return None
+    for key, pattern in SECTION_RES.items():
+        if pattern.search(head):
+            return key
+    return None
+
+
+def _is_short_title(line: str) -> bool:
+    return bool(re.match(r"^[A-Z][A-Za-z ]+$", line)) and len(line.split()) <= SECTION_HEADING_MAX_WORDS
+
+
+def _skill_subheading(line: str, lower: str) -> str | None:
+    """The category of a bare sub-heading such as "Databases" inside a skills section."""
+    if not _is_short_title(line) or SKILL_MATCHER.find_all(lower):
+        return None
+    return _skill_category_from_heading(line)
+
+
+def _ends_section(label: str, line: str, lower: str) -> bool:
+    if not _is_short_title(line):
+        return False
+    if label == "skills":
+        return _skill_category_from_heading(line) is None and not SKILL_MATCHER.find_all(lower)
+    if label == "education":
+        return not (INSTITUTION_RE.search(line) or EDUCATION_CONTEXT_RE.search(line))
+    return False
+
+
+def segment_sections(document: "ResumeDocument") -> Segmentation:
+    """Label every line with the section it belongs to in a single pass.
+
+    A short line naming a section starts it (inline content after a colon stays on the heading line).
+    Skills and education end at a short title-cased line that does not belong to them.
+    """
+    labels = []
+    sections = []
+    headings = set()
+    mentions = set()
+    bullet_lines = set(document.bullet_lines)
+    current = SECTION_OTHER
+    start = 0
+    for index, (line, lower) in enumerate(zip(document.lines, document.lower_lines)):
+        mentions.update(key for key, pattern in SECTION_RES.items() if pattern.search(lower))
+        label = None
+        if index not in bullet_lines:
+            label = _section_heading(line, lower)
+            if label is not None:
+                headings.add(index)
+            elif _ends_section(current, line, lower):
+                label = SECTION_OTHER
+        if label is not None and (label != current or index in headings):
+            if index > start:
+                sections.append(Section(current, start, index))
+            current, start = label, index
+        labels.append(current)
+    if len(labels) > start:
+        sections.append(Section(current, start, len(labels)))
+    return Segmentation(labels, sections, headings, mentions)
+
+
+def as_document(source: str | ResumeDocument) -> ResumeDocument:
+    return source if isinstance(source, ResumeDocument) else ResumeDocument(source)
+
+
+def detect_sections(text: str | ResumeDocument) -> dict:
+    document = as_document(text)
+    return {key: key in document.segmentation.mentions for key in SECTION_PATTERNS}
+
+
+def detect_resume_document(text: str | ResumeDocument) -> dict:
+    document = as_document(text)
+    lower = document.lower
+    sections = detect_sections(document)
+    emails = document.emails
+    years = document.years
+    bullets = document.bullets
 
     score = 0.0
     reasons = []
@@ -415,9 +601,10 @@ def detect_resume_document(text: str) -> dict:
     }
 
 
-def extract_links(text: str) -> dict:
-    urls = URL_RE.findall(text)
-    emails = EMAIL_RE.findall(text)
+def extract_links(text: str | ResumeDocument) -> dict:
+    document = as_document(text)
+    urls = document.urls
+    emails = document.emails
     github = [u for u in urls if "github.com" in u.lower()]
     linkedin = [u for u in urls if "linkedin.com" in u.lower()]
     portfolio = [u for u in urls if any(x in u.lower() for x in ["vercel.app", "netlify.app", "portfolio", "about.me"])]
@@ -499,10 +686,11 @@ def _name_from_slug(value: str | None) -> str | None:
     return " ".join(part.capitalize() for part in filtered)
 
 
-def extract_identity(text: str, filename: str = "", facts: dict | None = None) -> dict:
+def extract_identity(text: str | ResumeDocument, filename: str = "", facts: dict | None = None) -> dict:
     facts = facts or {}
-    lines = [line.strip() for line in text.splitlines() if line.strip()]
-    emails = EMAIL_RE.findall(text)
+    document = as_document(text)
+    lines = document.lines
+    emails = document.emails
     name = (facts.get("name") or "").strip() or None
 
     if not name:
@@ -545,34 +733,45 @@ def extract_identity(text: str, filename: str = "", facts: dict | None = None) -
     }
 
 
-def split_bullets(text: str) -> list[str]:
-    lines = [line.strip() for line in text.splitlines() if line.strip()]
-    bullets = []
-    for line in lines:
-        if line.startswith(("-", "•", "*")) or re.match(r"^\d+\.", line):
-            bullets.append(re.sub(r"^(-|•|\*|\d+\.)\s*", "", line).strip())
-    return bullets
+def split_bullets(text: str | ResumeDocument) -> list[str]:
+    return list(as_document(text).bullets)
 
 
-def skill_match(resume_text: str, target_role: str) -> dict:
+def skill_match(resume_text: str | ResumeDocument, target_role: str) -> dict:
     profile = ROLE_PROFILES.get(target_role) or ROLE_PROFILES["Software Engineering Intern"]
     role_keywords = profile["keywords"]
 
-    text = resume_text.lower()
-    matched = [kw for kw in role_keywords if kw in text]
-    missing = [kw for kw in role_keywords if kw not in matched]
+    found = as_document(resume_text).role_keywords
+    matched = [kw for kw in role_keywords if kw in found]
+    missing = [kw for kw in role_keywords if kw not in found]
     score = len(matched) / max(1, len(role_keywords))
     return {"matched": matched, "missing": missing, "score": round(score, 3)}
 
 
-def extract_skills(text: str, facts: dict | None = None) -> dict:
+def role_fit(resume_text: str | ResumeDocument) -> dict[str, float]:
+    """Keyword fit score for every role profile from a single scan of the resume."""
+    hits = dict.fromkeys(ROLE_PROFILES, 0)
+    for keyword in as_document(resume_text).role_keywords:
+        for role in ROLE_KEYWORD_ROLES[keyword]:
+            hits[role] += 1
+    return {
+        role: round(hits[role] / max(1, len(profile["keywords"])), 3)
+        for role, profile in ROLE_PROFILES.items()
+    }
+
+
+def find_skills(text: str | ResumeDocument) -> list[PhraseHit]:
+    """Every taxonomy skill mention in ``text`` with its span, found in a single scan."""
+    return SKILL_MATCHER.find_all(as_document(text).lower)
+
+
+def extract_skills(text: str | ResumeDocument, facts: dict | None = None) -> dict:
     facts = facts or {}
-    normalized = text.lower()
+    document = as_document(text)
     categorized = {category: [] for category in SKILL_CATEGORY_ORDER}
-    for skill, patterns in SKILL_PATTERNS.items():
-        if any(re.search(pattern, normalized, re.IGNORECASE) for pattern in patterns):
-            _add_skill_to_category(categorized, skill)
-    section_skills, section_categories = _extract_skills_from_sections(text)
+    for skill in dict.fromkeys(hit.label for hit in find_skills(document)):
+        _add_skill_to_category(categorized, skill)
+    section_skills, section_categories = _extract_skills_from_sections(document)
     fact_skills = _normalize_fact_skills([str(value) for value in facts.get("skills", [])])
     fact_skill_groups = _normalize_fact_skill_groups(facts.get("skill_groups"))
     for skill in section_skills:
@@ -653,32 +852,32 @@ def _add_skill_to_category(categorized: dict[str, list[str]], skill: str, prefer
     categorized.setdefault(category, []).append(skill)
 
 
-def _extract_skills_from_sections(text: str) -> tuple[list[str], dict[str, list[str]]]:
-    lines = [line.strip() for line in text.splitlines() if line.strip()]
+def _extract_skills_from_sections(document: ResumeDocument) -> tuple[list[str], dict[str, list[str]]]:
     collected = []
     categorized = {category: [] for category in SKILL_CATEGORY_ORDER}
-    in_skills_block = False
-
-    for line in lines:
-        lower = line.lower()
-        if re.search(SECTION_PATTERNS["skills"], lower):
-            in_skills_block = True
-            heading_category, found = _skills_from_line(line)
-            collected.extend(found)
-            for skill in found:
-                _add_skill_to_category(categorized, skill, preferred_category=heading_category)
-            continue
 
-        if in_skills_block and re.match(r"^[A-Z][A-Za-z ]+$", line) and len(line.split()) <= 4:
-            break
-
-        if in_skills_block:
+    headings = document.segmentation.headings
+    bullet_lines = set(document.bullet_lines)
+    for section in document.sections:
+        if section.label != "skills":
+            continue
+        subheading_category = None
+        for index in range(section.start, section.end):
+            line = document.lines[index]
+            if index not in bullet_lines:
+                category = _skill_subheading(line, document.lower_lines[index])
+                if category is not None:
+                    # A bare heading such as "Databases" names the category of the lines below it.
+                    subheading_category = category
+                    continue
             heading_category, extracted = _skills_from_line(line)
             if extracted:
                 collected.extend(extracted)
                 for skill in extracted:
-                    _add_skill_to_category(categorized, skill, preferred_category=heading_category)
-            elif len(line.split()) > 18:
+                    _add_skill_to_category(
+                        categorized, skill, preferred_category=heading_category or subheading_category
+                    )
+            elif index not in headings and len(line.split()) > 18:
                 break
 
     return sorted(dict.fromkeys(collected)), {
@@ -761,21 +960,22 @@ def _normalized_degrees_from_text(education_blob: str) -> list[str]:
     return found
 
 
-def _pick_relevant_education_lines(lines: list[str]) -> list[str]:
+def _pick_relevant_education_lines(document: ResumeDocument) -> list[str]:
+    segmentation = document.segmentation
+    indexes = document.section_lines("education")
+    in_section = bool(indexes)
+    if not in_section:
+        # Without an education section, degree and school lines can sit under any heading.
+        indexes = range(len(document.lines))
+
     picked = []
-    in_education_block = False
-    for line in lines:
-        lower = line.lower()
-        if re.search(SECTION_PATTERNS["education"], lower):
-            in_education_block = True
+    for index in indexes:
+        line = document.lines[index]
+        if in_section and index in segmentation.headings:
             picked.append(line)
-            continue
-        if in_education_block and re.match(r"^[A-Z][A-Za-z ]+$", line) and len(line.split()) <= 3:
-            break
-        if INSTITUTION_RE.search(line) or EDUCATION_CONTEXT_RE.search(line):
+        elif INSTITUTION_RE.search(line) or EDUCATION_CONTEXT_RE.search(line):
             picked.append(line)
-            continue
-        if in_education_block and YEAR_RE.search(line):
+        elif in_section and YEAR_RE.search(line):
             picked.append(line)
 
     return list(dict.fromkeys(picked))
@@ -788,10 +988,9 @@ def _highest_degree(degrees: list[str]) -> str | None:
     return None
 
 
-def extract_education(text: str, facts: dict | None = None) -> dict:
+def extract_education(text: str | ResumeDocument, facts: dict | None = None) -> dict:
     facts = facts or {}
-    lines = [line.strip() for line in text.splitlines() if line.strip()]
-    education_lines = _pick_relevant_education_lines(lines)
+    education_lines = _pick_relevant_education_lines(as_document(text))
     education_blob = "\n".join(education_lines) if education_lines else ""
 
     degrees = _normalized_degrees_from_text(education_blob)
@@ -829,36 +1028,68 @@ def extract_education(text: str, facts: dict | None = None) -> dict:
     }
 
 
-def compute_signals(resume_text: str, target_role: str, filename: str = "", facts: dict | None = None) -> dict:
-    facts = facts or {}
-    bullets = split_bullets(resume_text)
-    bullet_count = len(bullets)
-    bullets_with_numbers = sum(1 for bullet in bullets if NUMBER_RE.search(bullet))
-    action_verb_bullets = 0
+def bullet_features(resume_text: str | ResumeDocument) -> dict:
+    bullets = as_document(resume_text).bullets
+    verb_first = 0
     for bullet in bullets:
         first = bullet.split()[:1]
         if first and first[0].lower().strip(",.") in ACTION_VERBS:
-            action_verb_bullets += 1
-
-    avg_words = sum(len(bullet.split()) for bullet in bullets) / bullet_count if bullet_count else 0.0
-    sections = detect_sections(resume_text)
-    links = extract_links(resume_text)
-    identity = extract_identity(resume_text, filename=filename, facts=facts)
-    role = skill_match(resume_text, target_role)
-    skills = extract_skills(resume_text, facts=facts)
-    education = extract_education(resume_text, facts=facts)
-
-    clarity = min(
-        1.0,
-        0.4 + (0.3 if avg_words <= 22 else 0.1) + (0.3 if action_verb_bullets / max(1, bullet_count) >= 0.4 else 0.1),
-    )
-    impact = min(1.0, bullets_with_numbers / max(1, bullet_count))
-    evidence = min(
-        1.0,
-        (0.5 if links["github"] else 0.2) + (0.3 if links["linkedin"] else 0.1) + (0.2 if links["portfolio"] else 0.0),
-    )
-    ats = role["score"]
-    overall = round(0.35 * ats + 0.25 * impact + 0.25 * clarity + 0.15 * evidence, 3)
+            verb_first += 1
+    return {
+        "bullet_count": len(bullets),
+        "bullet_words": sum(len(bullet.split()) for bullet in bullets),
+        "bullets_with_numbers": sum(1 for bullet in bullets if NUMBER_RE.search(bullet)),
+        "verb_first": verb_first,
+    }
+
+
+def signal_features(bullet_stats: dict, links: dict, role: dict) -> dict:
+    """Inputs of the scoring engine, stored with the profile so scores can be recomputed later."""
+    return {
+        "bullet_count": bullet_stats["bullet_count"],
+        "bullet_words": bullet_stats["bullet_words"],
+        "bullets_with_numbers": bullet_stats["bullets_with_numbers"],
+        "verb_first": bullet_stats["verb_first"],
+        "has_github": bool(links.get("github")),
+        "has_linkedin": bool(links.get("linkedin")),
+        "has_portfolio": bool(links.get("portfolio")),
+        "keyword_hits": len(role["matched"]),
+        "keyword_total": len(role["matched"]) + len(role["missing"]),
+    }
+
+
+def compute_signals(
+    resume_text: str | ResumeDocument,
+    target_role: str,
+    filename: str = "",
+    facts: dict | None = None,
+    document: ResumeDocument | None = None,
+) -> dict:
+    facts = facts or {}
+    text = resume_text.text if isinstance(resume_text, ResumeDocument) else resume_text
+    # The document-check bundle is only reusable when cleanup left the text untouched.
+    if document is None or document.text != text:
+        document = as_document(resume_text)
+    with stage("nlp.bullets"):
+        bullet_stats = bullet_features(document)
+    bullet_count = bullet_stats["bullet_count"]
+    avg_words = bullet_stats["bullet_words"] / bullet_count if bullet_count else 0.0
+    with stage("nlp.sections"):
+        sections = detect_sections(document)
+    with stage("nlp.links"):
+        links = extract_links(document)
+    with stage("nlp.identity"):
+        identity = extract_identity(document, filename=filename, facts=facts)
+    with stage("nlp.keywords"):
+        role = skill_match(document, target_role)
+        fit = role_fit(document)
+    with stage("nlp.skills"):
+        skills = extract_skills(document, facts=facts)
+    with stage("nlp.education"):
+        education = extract_education(document, facts=facts)
+    with stage("nlp.scoring"):
+        features = signal_features(bullet_stats, links, role)
+        scores = score_features(features)
 
     return {
         "target_role": target_role,
@@ -870,15 +1101,62 @@ def compute_signals(resume_text: str, target_role: str, filename: str = "", fact
         "bullets": {
             "count": bullet_count,
             "avg_words": round(avg_words, 2),
-            "with_numbers": bullets_with_numbers,
-            "verb_first": action_verb_bullets,
+            "with_numbers": bullet_stats["bullets_with_numbers"],
+            "verb_first": bullet_stats["verb_first"],
         },
         "keywords": role,
-        "scores": {
-            "ats": round(ats, 3),
-            "impact": round(impact, 3),
-            "clarity": round(clarity, 3),
-            "evidence": round(evidence, 3),
-            "overall": overall,
-        },
+        "role_fit": fit,
+        "features": features,
+        "scores": scores,
     }
+
+
+def _compute_signals_item(item: str | dict, target_role: str) -> dict:
+    if isinstance(item, str):
+        return compute_signals(item, target_role)
+    return compute_signals(
+        item["text"],
+        item.get("target_role") or target_role,
+        filename=item.get("filename", ""),
+        facts=item.get("facts"),
+    )
+
+
+def _compute_signals_chunk(items: list[str | dict], target_role: str) -> list[dict]:
+    return [_compute_signals_item(item, target_role) for item in items]
+
+
+def compute_signals_many(
+    items: Iterable[str | dict],
+    target_role: str,
+    workers: int | None = None,
+    chunksize: int = 16,
+) -> Iterator[dict]:
+    """Yield compute_signals results for many resumes, in input order.
+
+    Items are resume texts or dicts with "text" and optional "filename", "facts" and "target_role".
+    Chunks are spread over a process pool; the skill and keyword matchers are compiled once per
+    worker when it imports this module. Only a few chunks are in flight at a time, so memory stays
+    flat however long ``items`` is.
+    """
+    workers = workers or os.cpu_count() or 1
+    chunksize = max(1, chunksize)
+    iterator = iter(items)
+    chunks = iter(lambda: list(islice(iterator, chunksize)), [])
+
+    if workers <= 1:
+        for chunk in chunks:
+            yield from _compute_signals_chunk(chunk, target_role)
+        return
+
+    executor = ProcessPoolExecutor(max_workers=workers, mp_context=get_context("spawn"))
+    pending = deque()
+    try:
+        for chunk in chunks:
+            pending.append(executor.submit(_compute_signals_chunk, chunk, target_role))
+            if len(pending) >= workers * 2:
+                yield from pending.popleft().result()
+        while pending:
+            yield from pending.popleft().result()
+    finally:
+        executor.shutdown(wait=True, cancel_futures=True)
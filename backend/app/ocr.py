@@ -0,0 +1,338 @@
+import io
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+from multiprocessing import get_context
+from shutil import which
+from typing import NamedTuple
+
+
+OCR_PREPROCESS = os.getenv("OCR_PREPROCESS", "1").lower() not in {"0", "false", "no"}
+OCR_DESKEW = os.getenv("OCR_DESKEW", "1").lower() not in {"0", "false", "no"}
+OCR_DESKEW_MAX_ANGLE = int(os.getenv("OCR_DESKEW_MAX_ANGLE", "5"))
+# A rotation must sharpen the row profile by at least this factor over the unrotated image.
+OCR_DESKEW_MIN_GAIN = 1.1
+OCR_WORKERS = int(os.getenv("OCR_WORKERS", str(min(4, os.cpu_count() or 1))))
+# Workers are replaced after this many images so Tesseract/Pillow memory growth stays bounded.
+OCR_MAX_TASKS_PER_CHILD = int(os.getenv("OCR_MAX_TASKS_PER_CHILD", "25"))
+# "tesserocr" keeps Tesseract and its traineddata loaded in each worker; "pytesseract" runs the CLI per image.
+OCR_ENGINE = os.getenv("OCR_ENGINE", "auto").strip().lower()
+
+_executor: ProcessPoolExecutor | None = None
+_executor_lock = threading.Lock()
+
+# Resolved once per process; None until the first lookup, "" when Tesseract is missing.
+_tesseract_cmd: str | None = None
+_engine: str | None = None
+_api = None
+_api_lock = threading.Lock()
+
+
+def _find_tesseract_cmd() -> str:
+    import pytesseract
+
+    configured = os.getenv("TESSERACT_CMD", "").strip()
+    cmd = configured or pytesseract.pytesseract.tesseract_cmd
+    binary = cmd if os.path.isabs(cmd) else which(cmd)
+    if not binary and not configured:
+        binary = which("tesseract")
+    return binary or ""
+
+
+def _configure_tesseract() -> None:
+    global _tesseract_cmd
+    if _tesseract_cmd is None:
+        _tesseract_cmd = _find_tesseract_cmd()
+
+    if not _tesseract_cmd:
+        raise RuntimeError(
+            "Tesseract OCR is required. Install Tesseract and set TESSERACT_CMD if it is not on PATH."
+        )
+
+    import pytesseract
+
+    pytesseract.pytesseract.tesseract_cmd = _tesseract_cmd
+
+
+def _ocr_engine() -> str:
+    global _engine
+    if _engine is None:
+        _engine = "pytesseract"
+        if OCR_ENGINE in {"auto", "tesserocr"}:
+            try:
+                import tesserocr  # noqa: F401
+
+                _engine = "tesserocr"
+            except ImportError:
+                pass
+    return _engine
+
+
+def tesseract_available() -> bool:
+    if _ocr_engine() == "tesserocr":
+        return True
+    try:
+        _configure_tesseract()
+    except Exception:
+        return False
+    return True
+
+
+class RawImage(NamedTuple):
+    """Uncompressed pixels, e.g. a PyMuPDF pixmap, handed to OCR without a PNG round-trip."""
+
+    mode: str
+    width: int
+    height: int
+    samples: bytes
+
+
+def _load_image(image: RawImage | bytes):
+    from PIL import Image
+
+    if isinstance(image, RawImage):
+        return Image.frombytes(image.mode, (image.width, image.height), image.samples)
+    with Image.open(io.BytesIO(image)) as encoded:
+        encoded.load()
+        return encoded.copy()
+
+
+def _otsu_threshold(histogram: list[int]) -> int:
+    total = sum(histogram)
+    if not total:
+        return 128
+
+    weighted_total = sum(value * count for value, count in enumerate(histogram))
+    background = weighted_background = 0
+    best_threshold, best_variance = 128, -1.0
+    for value, count in enumerate(histogram):
+        background += count
+        if not background:
+            continue
+        foreground = total - background
+        if not foreground:
+            break
+        weighted_background += value * count
+        mean_background = weighted_background / background
+        mean_foreground = (weighted_total - weighted_background) / foreground
+        variance = background * foreground * (mean_background - mean_foreground) ** 2
+        if variance > best_variance:
+            best_threshold, best_variance = value, variance
+    return best_threshold
+
+
+def _skew_angle(binary) -> int:
+    from PIL import Image
+
+    # Text lines produce the sharpest row profile when they are horizontal.
+    sample = binary.copy()
+    sample.thumbnail((600, 600))
+
+    # Only the centre is scored, so the blank corners a rotation adds do not count as contrast.
+    margin_x, margin_y = sample.width // 10, sample.height // 10
+    centre = (margin_x, margin_y, sample.width - margin_x, sample.height - margin_y)
+
+    def profile_score(angle: int) -> float:
+        rotated = sample.rotate(angle, resample=Image.NEAREST, fillcolor=255) if angle else sample
+        rotated = rotated.crop(centre)
+        rows = list(rotated.resize((1, rotated.height), Image.BOX).getdata())
+        return sum((rows[index] - rows[index - 1]) ** 2 for index in range(1, len(rows)))
+
+    # Blank or uniform images score about the same at every angle; those stay unrotated.
+    best_angle, best_score = 0, profile_score(0) * OCR_DESKEW_MIN_GAIN
+    for angle in range(-OCR_DESKEW_MAX_ANGLE, OCR_DESKEW_MAX_ANGLE + 1):
+        if not angle:
+            continue
+        score = profile_score(angle)
+        if score > best_score:
+            best_angle, best_score = angle, score
+    return best_angle
+
+
+def preprocess_image(image):
+    from PIL import Image
+
+    gray = image if image.mode == "L" else image.convert("L")
+    threshold = _otsu_threshold(gray.histogram())
+    binary = gray.point([0 if value <= threshold else 255 for value in range(256)])
+    if OCR_DESKEW:
+        angle = _skew_angle(binary)
+        if angle:
+            binary = binary.rotate(angle, resample=Image.BICUBIC, expand=True, fillcolor=255)
+    return binary
+
+
+def _text_from_data(data: dict) -> tuple[str, float]:
+    lines: dict[tuple[int, int, int], list[str]] = {}
+    confidences = []
+    for index, word in enumerate(data.get("text", [])):
+        word = (word or "").strip()
+        confidence = float(data["conf"][index])
+        if not word or confidence < 0:
+            continue
+        key = (data["block_num"][index], data["par_num"][index], data["line_num"][index])
+        lines.setdefault(key, []).append(word)
+        confidences.append(confidence)
+
+    text = "\n".join(" ".join(words) for _, words in sorted(lines.items()))
+    confidence = sum(confidences) / len(confidences) if confidences else 0.0
+    return text, confidence
+
+
+def _tesserocr_api():
+    global _api
+    if _api is None:
+        import tesserocr
+
+        _api = tesserocr.PyTessBaseAPI()
+    return _api
+
+
+def _run_tesseract(image, timeout: float = 0) -> tuple[str, float]:
+    if _ocr_engine() == "tesserocr":
+        # The API object is reused, so the language data is loaded only once per process.
+        with _api_lock:
+            api = _tesserocr_api()
+            api.SetImage(image)
+            return api.GetUTF8Text(), float(api.MeanTextConf())
+
+    import pytesseract
+
+    _configure_tesseract()
+    # pytesseract writes the image to a temp file; uncompressed PNM avoids a PNG encode.
+    image.format = "PPM" if image.mode in {"L", "RGB"} else "PNG"
+    data = pytesseract.image_to_data(image, output_type=pytesseract.Output.DICT, timeout=timeout)
+    return _text_from_data(data)
+
+
+def _ocr_image(image: RawImage | bytes, timeout: float = 0) -> dict:
+    prepared = _load_image(image)
+    if OCR_PREPROCESS:
+        prepared = preprocess_image(prepared)
+    text, confidence = _run_tesseract(prepared, timeout=timeout)
+    return {"text": text.strip(), "confidence": round(confidence, 2)}
+
+
+def optional_ocr_image(image: RawImage | bytes, timeout: float = 0) -> dict:
+    """OCR one image; instead of raising, a failed image comes back empty with an ``error`` reason."""
+    try:
+        return _ocr_image(image, timeout=timeout)
+    except RuntimeError as exc:
+        # pytesseract reports its own timeout as RuntimeError("Tesseract process timeout").
+        reason = "ocr time limit" if "timeout" in str(exc).lower() else "ocr error"
+        return {"text": "", "confidence": 0.0, "error": reason}
+    except Exception:
+        return {"text": "", "confidence": 0.0, "error": "ocr error"}
+
+
+def _init_ocr_worker(tesseract_cmd: str) -> None:
+    global _tesseract_cmd
+    # Pages already run in parallel, so keep each Tesseract process single-threaded.
+    os.environ["OMP_THREAD_LIMIT"] = "1"
+    _tesseract_cmd = tesseract_cmd
+    if _ocr_engine() == "tesserocr":
+        try:
+            _tesserocr_api()
+        except Exception:
+            pass
+
+
+def _warm_worker() -> bool:
+    return tesseract_available()
+
+
+def get_ocr_executor() -> ProcessPoolExecutor | None:
+    global _executor
+    if OCR_WORKERS <= 1:
+        return None
+
+    with _executor_lock:
+        if _executor is None:
+            if _tesseract_cmd is None:
+                tesseract_available()
+            _executor = ProcessPoolExecutor(
+                max_workers=OCR_WORKERS,
+                mp_context=get_context("spawn"),
+                initializer=_init_ocr_worker,
+                initargs=(_tesseract_cmd or "",),
+                max_tasks_per_child=OCR_MAX_TASKS_PER_CHILD if OCR_MAX_TASKS_PER_CHILD > 0 else None,
+            )
+        return _executor
+
+
+def start_ocr_service() -> None:
+    """Resolve Tesseract and start the OCR workers before the first upload arrives."""
+    if not tesseract_available():
+        return
+    executor = get_ocr_executor()
+    if executor is None:
+        if _ocr_engine() == "tesserocr":
+            _tesserocr_api()
+        return
+    try:
+        for future in [executor.submit(_warm_worker) for _ in range(OCR_WORKERS)]:
+            future.result()
+    except BrokenProcessPool:
+        _discard_executor(executor)
+
+
+def _discard_executor(executor: ProcessPoolExecutor) -> None:
+    global _executor
+    with _executor_lock:
+        if _executor is executor:
+            _executor = None
+    executor.shutdown(wait=False, cancel_futures=True)
+
+
+def shutdown_ocr_executor() -> None:
+    global _executor, _api
+    with _executor_lock:
+        executor, _executor = _executor, None
+    if executor is not None:
+        executor.shutdown(wait=True, cancel_futures=True)
+    with _api_lock:
+        if _api is not None:
+            _api.End()
+            _api = None
+
+
+def _remaining(deadline: float | None) -> float | None:
+    return None if deadline is None else max(0.0, deadline - time.monotonic())
+
+
+def ocr_images(images: list[RawImage | bytes], deadline: float | None = None) -> list[dict | None]:
+    """OCR images in parallel and return {"text", "confidence"} results in input order.
+
+    Images that are not finished before ``deadline`` (a time.monotonic() value) come back as None,
+    and images whose OCR timed out or failed carry an ``error`` reason.
+    """
+    if not images:
+        return []
+
+    executor = get_ocr_executor() if len(images) > 1 else None
+    if executor is not None:
+        try:
+            timeout = _remaining(deadline) or 0
+            futures = [executor.submit(optional_ocr_image, image, timeout) for image in images]
+            done, _ = wait(futures, timeout=_remaining(deadline))
+            results = []
+            for future in futures:
+                if future in done:
+                    results.append(future.result())
+                else:
+                    future.cancel()
+                    results.append(None)
+            return results
+        except BrokenProcessPool:
+            _discard_executor(executor)
+
+    results = []
+    for image in images:
+        remaining = _remaining(deadline)
+        if remaining is not None and remaining <= 0:
+            results.append(None)
+            continue
+        results.append(optional_ocr_image(image, remaining or 0))
+    return results
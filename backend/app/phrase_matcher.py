@@ -0,0 +1,71 @@
+from typing import Iterable, NamedTuple
+
+
+_TERMINAL = ""
+
+
+class PhraseHit(NamedTuple):
+    label: str
+    phrase: str
+    start: int
+    end: int
+
+
+def _is_word_char(char: str) -> bool:
+    return char.isalnum() or char == "_"
+
+
+class PhraseMatcher:
+    """Match many literal phrases in one pass with regex ``\\b...\\b`` semantics.
+
+    Phrases live in a character trie that is walked only from word-boundary positions,
+    so the cost of a scan depends on the text length, not on how many phrases are loaded.
+    """
+
+    def __init__(self, phrases: dict[str, Iterable[str]], guards: dict[str, str] | None = None):
+        self._root: dict = {}
+        # Characters that must not appear directly before or after a label's phrases.
+        self._guards = guards or {}
+        for label, values in phrases.items():
+            for phrase in values:
+                if not phrase:
+                    continue
+                node = self._root
+                for char in phrase:
+                    node = node.setdefault(char, {})
+                node.setdefault(_TERMINAL, []).append((label, phrase))
+
+    def find_all(self, text: str) -> list[PhraseHit]:
+        """Return every (possibly overlapping) phrase occurrence, ordered by start then end."""
+        root = self._root
+        guards = self._guards
+        length = len(text)
+        word = [_is_word_char(char) for char in text]
+        word.append(False)
+        hits = []
+        previous = False
+        for start in range(length):
+            current = word[start]
+            at_boundary = current != previous
+            previous = current
+            if not at_boundary or text[start] not in root:
+                continue
+            node = root
+            for end in range(start, length):
+                node = node.get(text[end])
+                if node is None:
+                    break
+                matches = node.get(_TERMINAL)
+                if matches is None or word[end] == word[end + 1]:
+                    continue
+                for label, phrase in matches:
+                    guard = guards.get(label)
+                    if guard and (
+                        (start and text[start - 1] in guard) or (end + 1 < length and text[end + 1] in guard)
+                    ):
+                        continue
+                    hits.append(PhraseHit(label, phrase, start, end + 1))
+        return hits
+
+    def labels(self, text: str) -> set[str]:
+        return {hit.label for hit in self.find_all(text)}
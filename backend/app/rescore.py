@@ -0,0 +1,200 @@
+import argparse
+import json
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from multiprocessing import get_context
+
+from sqlalchemy import select, update
+
+from .db import SessionLocal
+from .models import Resume
+from .nlp_pipeline import (
+    PIPELINE_VERSION,
+    ResumeDocument,
+    bullet_features,
+    role_fit,
+    signal_features,
+    skill_match,
+)
+from .scoring import features_to_columns, score_batch
+from .search_index import resume_summary
+
+
+RESCORE_BATCH_SIZE = int(os.getenv("RESCORE_BATCH_SIZE", "1000"))
+RESCORE_WORKERS = int(os.getenv("RESCORE_WORKERS", str(min(4, os.cpu_count() or 1))))
+RESCORE_CHECKPOINT = os.getenv("RESCORE_CHECKPOINT", "rescore_checkpoint.json")
+
+_run_lock = threading.Lock()
+_status_lock = threading.Lock()
+_status: dict = {"running": False}
+
+
+def rescore_profiles(rows: list[tuple[str, str | None, dict]]) -> list[dict]:
+    """Re-run the keyword and scoring stages for (text, target_role, nlp_json) rows."""
+    updated = []
+    for text, target_role, nlp in rows:
+        nlp = dict(nlp or {})
+        document = ResumeDocument(text or "")
+        role = skill_match(document, target_role or nlp.get("target_role") or "")
+        stored = nlp.get("features")
+        bullet_stats = stored if stored else bullet_features(document)
+        links = nlp.get("links") or {}
+        nlp["keywords"] = role
+        nlp["role_fit"] = role_fit(document)
+        nlp["features"] = signal_features(bullet_stats, links, role)
+        updated.append(nlp)
+
+    scores = score_batch(features_to_columns(nlp["features"] for nlp in updated))
+    for index, nlp in enumerate(updated):
+        nlp["scores"] = {name: values[index] for name, values in scores.items()}
+    return updated
+
+
+def _load_checkpoint(path: str) -> dict:
+    try:
+        with open(path, encoding="utf-8") as handle:
+            checkpoint = json.load(handle)
+    except (OSError, ValueError):
+        return {}
+    # A checkpoint from another pipeline version scored rows with different rules.
+    return checkpoint if checkpoint.get("pipeline_version") == PIPELINE_VERSION else {}
+
+
+def _save_checkpoint(path: str, checkpoint: dict) -> None:
+    partial = f"{path}.tmp"
+    with open(partial, "w", encoding="utf-8") as handle:
+        json.dump(checkpoint, handle)
+    os.replace(partial, path)
+
+
+def _split(rows: list, parts: int) -> list[list]:
+    size = max(1, -(-len(rows) // parts))
+    return [rows[start:start + size] for start in range(0, len(rows), size)]
+
+
+def _set_status(**values) -> None:
+    with _status_lock:
+        _status.update(values)
+
+
+def rescore_status() -> dict:
+    with _status_lock:
+        return dict(_status)
+
+
+def run_rescore(
+    batch_size: int = RESCORE_BATCH_SIZE,
+    workers: int = RESCORE_WORKERS,
+    checkpoint_path: str | None = RESCORE_CHECKPOINT,
+    restart: bool = False,
+    progress=None,
+) -> dict:
+    """Re-score every stored resume in id order, one committed batch at a time.
+
+    Progress is checkpointed after each batch, so an interrupted run resumes after the last
+    committed id. The checkpoint is removed once every row has been re-scored.
+    """
+    if not _run_lock.acquire(blocking=False):
+        raise RuntimeError("a rescore job is already running")
+
+    started = time.monotonic()
+    executor = None
+    try:
+        checkpoint = {} if restart or not checkpoint_path else _load_checkpoint(checkpoint_path)
+        last_id = int(checkpoint.get("last_id", 0))
+        processed = int(checkpoint.get("processed", 0))
+        with SessionLocal() as session:
+            total = session.query(Resume).count()
+        _set_status(
+            running=True, pipeline_version=PIPELINE_VERSION, total=total, processed=processed,
+            last_id=last_id, started_at=datetime.utcnow().isoformat(), finished_at=None, error=None,
+        )
+        if workers > 1:
+            executor = ProcessPoolExecutor(max_workers=workers, mp_context=get_context("spawn"))
+
+        while True:
+            with SessionLocal() as session:
+                batch = session.execute(
+                    select(Resume.id, Resume.text, Resume.target_role, Resume.nlp_json, Resume.llm_json)
+                    .where(Resume.id > last_id)
+                    .order_by(Resume.id)
+                    .limit(batch_size)
+                ).all()
+                if not batch:
+                    break
+
+                rows = [(row.text, row.target_role, row.nlp_json) for row in batch]
+                if executor is not None and len(rows) > 1:
+                    profiles = [
+                        profile
+                        for chunk in executor.map(rescore_profiles, _split(rows, workers))
+                        for profile in chunk
+                    ]
+                else:
+                    profiles = rescore_profiles(rows)
+
+                session.execute(
+                    update(Resume),
+                    [
+                        {
+                            "id": row.id,
+                            "nlp_json": profile,
+                            "overall_score": profile["scores"]["overall"],
+                            "summary_json": resume_summary(profile, row.llm_json),
+                        }
+                        for row, profile in zip(batch, profiles)
+                    ],
+                )
+                session.commit()
+
+            last_id = batch[-1].id
+            processed += len(batch)
+            if checkpoint_path:
+                _save_checkpoint(
+                    checkpoint_path,
+                    {"pipeline_version": PIPELINE_VERSION, "last_id": last_id, "processed": processed},
+                )
+            _set_status(processed=processed, last_id=last_id)
+            if progress is not None:
+                progress(processed, total)
+
+        if checkpoint_path and os.path.exists(checkpoint_path):
+            os.remove(checkpoint_path)
+        result = {"processed": processed, "last_id": last_id, "seconds": round(time.monotonic() - started, 2)}
+        _set_status(running=False, finished_at=datetime.utcnow().isoformat(), **result)
+        return result
+    except BaseException as exc:
+        _set_status(running=False, finished_at=datetime.utcnow().isoformat(), error=str(exc))
+        raise
+    finally:
+        if executor is not None:
+            executor.shutdown(wait=True, cancel_futures=True)
+        _run_lock.release()
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Re-score stored resumes with the current keywords and weights.")
+    parser.add_argument("--batch-size", type=int, default=RESCORE_BATCH_SIZE, help="rows read and committed per batch")
+    parser.add_argument("--workers", type=int, default=RESCORE_WORKERS, help="worker processes; 1 runs in-process")
+    parser.add_argument("--checkpoint", default=RESCORE_CHECKPOINT, help="checkpoint file used to resume a run")
+    parser.add_argument("--restart", action="store_true", help="ignore an existing checkpoint")
+    args = parser.parse_args(argv)
+
+    def report(processed: int, total: int) -> None:
+        print(f"rescored {processed}/{total}", flush=True)
+
+    result = run_rescore(
+        batch_size=max(1, args.batch_size),
+        workers=args.workers,
+        checkpoint_path=args.checkpoint,
+        restart=args.restart,
+        progress=report,
+    )
+    print(f"done: {result['processed']} resumes in {result['seconds']}s")
+
+
+if __name__ == "__main__":
+    main()
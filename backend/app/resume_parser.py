@@ -1,104 +1,455 @@
 import io
 import os
+import re
+import time
 import zipfile
-from shutil import which
+from typing import Callable
 
+from .ocr import RawImage, ocr_images, tesseract_available
+from .timing import stage
 
-def _configure_tesseract() -> None:
-    import pytesseract
 
-    configured = os.getenv("TESSERACT_CMD", "").strip()
-    if configured:
-        pytesseract.pytesseract.tesseract_cmd = configured
+# Bump whenever extraction output changes so cached extractions are not reused.
+EXTRACTOR_VERSION = "6"
 
-    cmd = pytesseract.pytesseract.tesseract_cmd
-    binary = cmd if os.path.isabs(cmd) else which(cmd)
-    if not binary and not configured:
-        binary = which("tesseract")
 
-    if not binary:
-        raise RuntimeError(
-            "Tesseract OCR is required. Install Tesseract and set TESSERACT_CMD if it is not on PATH."
-        )
+# A page is only sent to OCR when its text layer looks unusable.
+OCR_MIN_TEXT_CHARS = int(os.getenv("OCR_MIN_TEXT_CHARS", "100"))
+OCR_MIN_GLYPH_COVERAGE = float(os.getenv("OCR_MIN_GLYPH_COVERAGE", "0.9"))
+OCR_MAX_IMAGE_COVERAGE = float(os.getenv("OCR_MAX_IMAGE_COVERAGE", "0.5"))
 
-    pytesseract.pytesseract.tesseract_cmd = binary
+# "pymupdf" opens each PDF once; "pdfplumber" keeps the older two-parser path.
+PDF_EXTRACTOR = os.getenv("PDF_EXTRACTOR", "pymupdf").strip().lower()
 
+# Pages are OCR'd at the first DPI and only re-rendered at the next one while confidence stays low.
+OCR_DPI_LADDER = [int(value) for value in os.getenv("OCR_DPI_LADDER", "100,200,300").split(",") if value.strip()]
+OCR_MIN_CONFIDENCE = float(os.getenv("OCR_MIN_CONFIDENCE", "70"))
 
-def _ocr_image_bytes(image_bytes: bytes) -> str:
-    import pytesseract
-    from PIL import Image
+# When a page has both a text layer and OCR text, near-identical sources keep only the text layer,
+# otherwise OCR lines are merged in unless they fuzzily duplicate an existing line.
+OCR_SAME_PAGE_SCORE = float(os.getenv("OCR_SAME_PAGE_SCORE", "85"))
+OCR_DUPLICATE_LINE_SCORE = float(os.getenv("OCR_DUPLICATE_LINE_SCORE", "80"))
 
-    _configure_tesseract()
-    with Image.open(io.BytesIO(image_bytes)) as image:
-        text = pytesseract.image_to_string(image)
-    return text.strip()
+# Per-document extraction budget; 0 disables a limit.
+EXTRACTION_MAX_PAGES = int(os.getenv("EXTRACTION_MAX_PAGES", "15"))
+EXTRACTION_MAX_OCR_SECONDS = float(os.getenv("EXTRACTION_MAX_OCR_SECONDS", "45"))
+EXTRACTION_MAX_IMAGES = int(os.getenv("EXTRACTION_MAX_IMAGES", "20"))
+EXTRACTION_EARLY_CHECK_PAGES = int(os.getenv("EXTRACTION_EARLY_CHECK_PAGES", "2"))
 
+UNMAPPED_GLYPH_RE = re.compile(r"\(cid:\d+\)|\ufffd")
 
-def _optional_ocr_image_bytes(image_bytes: bytes) -> str:
-    try:
-        return _ocr_image_bytes(image_bytes)
-    except Exception:
-        return ""
+# Uploads arrive as a spooled file path; in-memory bytes are still accepted.
+Source = bytes | str | os.PathLike
+
+
+def _as_file(source: Source):
+    return io.BytesIO(source) if isinstance(source, (bytes, bytearray)) else source
+
+
+def _open_fitz(source: Source):
+    import fitz
+
+    if isinstance(source, (bytes, bytearray)):
+        return fitz.open(stream=source, filetype="pdf")
+    return fitz.open(os.fspath(source), filetype="pdf")
 
 
 def _normalize_chunks(chunks: list[str]) -> str:
     return "\n".join(chunk.strip() for chunk in chunks if chunk and chunk.strip()).strip()
 
 
-def extract_text_from_pdf(data: bytes) -> str:
+def _merge_lines(base: str, extra: str) -> tuple[str, int]:
+    from rapidfuzz import fuzz, process, utils
+
+    merged = [line.strip() for line in base.splitlines() if line.strip()]
+    added = 0
+    for line in extra.splitlines():
+        line = line.strip()
+        if not line:
+            continue
+        duplicate = process.extractOne(
+            line,
+            merged,
+            scorer=fuzz.ratio,
+            processor=utils.default_process,
+            score_cutoff=OCR_DUPLICATE_LINE_SCORE,
+        )
+        if duplicate is None:
+            merged.append(line)
+            added += 1
+    return "\n".join(merged), added
+
+
+def _reconcile_page(direct: str, ocr: str, glyph_coverage: float) -> tuple[str, str]:
+    if not ocr.strip():
+        return direct, "text_layer"
+    if not direct.strip() or glyph_coverage < OCR_MIN_GLYPH_COVERAGE:
+        return ocr, "ocr"
+
+    from rapidfuzz import fuzz, utils
+
+    if fuzz.token_sort_ratio(direct, ocr, processor=utils.default_process) >= OCR_SAME_PAGE_SCORE:
+        return direct, "text_layer"
+    merged, added = _merge_lines(direct, ocr)
+    return merged, "merged" if added else "text_layer"
+
+
+def _glyph_coverage(text: str) -> float:
+    compact = "".join(text.split())
+    if not compact:
+        return 0.0
+    unmapped = UNMAPPED_GLYPH_RE.findall(compact)
+    unmapped_chars = sum(len(match) for match in unmapped)
+    mapped = len(compact) - unmapped_chars
+    return mapped / max(1, mapped + len(unmapped))
+
+
+def _image_coverage(boxes: list[tuple[float, float, float, float]], width: float, height: float) -> float:
+    page_area = float(width) * float(height)
+    if page_area <= 0:
+        return 0.0
+
+    covered = 0.0
+    for x0, top, x1, bottom in boxes:
+        x0, x1 = max(float(x0), 0.0), min(float(x1), float(width))
+        top, bottom = max(float(top), 0.0), min(float(bottom), float(height))
+        if x1 > x0 and bottom > top:
+            covered += (x1 - x0) * (bottom - top)
+    return min(1.0, covered / page_area)
+
+
+def _page_ocr_decision(text: str, image_coverage: float) -> dict:
+    chars = len("".join(text.split()))
+    glyph_coverage = _glyph_coverage(text)
+
+    if chars == 0:
+        needs_ocr, reason = True, "no text layer"
+    elif chars < OCR_MIN_TEXT_CHARS:
+        needs_ocr, reason = True, "sparse text layer"
+    elif glyph_coverage < OCR_MIN_GLYPH_COVERAGE:
+        needs_ocr, reason = True, "unmapped glyphs in text layer"
+    elif image_coverage >= OCR_MAX_IMAGE_COVERAGE:
+        needs_ocr, reason = True, "large images may contain text"
+    else:
+        needs_ocr, reason = False, "text layer usable"
+
+    return {
+        "chars": chars,
+        "glyph_coverage": round(glyph_coverage, 3),
+        "image_coverage": round(image_coverage, 3),
+        "ocr": needs_ocr,
+        "reason": reason,
+    }
+
+
+def _pdf_extractor() -> str:
+    if PDF_EXTRACTOR == "pdfplumber":
+        return "pdfplumber"
+    try:
+        import fitz  # noqa: F401
+    except ImportError:
+        return "pdfplumber"
+    return "pymupdf"
+
+
+def _render_page(page, dpi: int) -> RawImage:
+    import fitz
+
+    zoom = dpi / 72
+    pix = page.get_pixmap(matrix=fitz.Matrix(zoom, zoom), colorspace=fitz.csGRAY, alpha=False)
+    return RawImage("L", pix.width, pix.height, pix.samples)
+
+
+class ExtractionBudget:
+    """Per-document limits; work left when a limit is hit is skipped and the result is marked truncated."""
+
+    def __init__(
+        self,
+        max_pages: int = EXTRACTION_MAX_PAGES,
+        max_ocr_seconds: float = EXTRACTION_MAX_OCR_SECONDS,
+        max_images: int = EXTRACTION_MAX_IMAGES,
+    ):
+        self.max_pages = max_pages
+        self.max_ocr_seconds = max_ocr_seconds
+        self.max_images = max_images
+        self.images_used = 0
+        self.reasons: list[str] = []
+        self.rejected_early = False
+        self._ocr_deadline: float | None = None
+
+    def allows_page(self, number: int) -> bool:
+        if self.max_pages > 0 and number > self.max_pages:
+            self.truncate("page limit")
+            return False
+        return True
+
+    def take_images(self, count: int) -> int:
+        allowed = count if self.max_images <= 0 else max(0, min(count, self.max_images - self.images_used))
+        self.images_used += allowed
+        return allowed
+
+    def ocr_deadline(self) -> float | None:
+        # The OCR clock starts with the first OCR call, not with the upload.
+        if self.max_ocr_seconds <= 0:
+            return None
+        if self._ocr_deadline is None:
+            self._ocr_deadline = time.monotonic() + self.max_ocr_seconds
+        return self._ocr_deadline
+
+    def truncate(self, reason: str) -> None:
+        if reason not in self.reasons:
+            self.reasons.append(reason)
+
+    def report(self) -> dict:
+        return {
+            "truncated": bool(self.reasons),
+            "truncation_reasons": list(self.reasons),
+            "rejected_early": self.rejected_early,
+        }
+
+
+def _ocr_failure(result: dict | None) -> str | None:
+    # None means the image was still queued when the OCR deadline passed.
+    return "ocr time limit" if result is None else result.get("error")
+
+
+def _ocr_pdf_pages(doc, numbers: list[int], budget: ExtractionBudget) -> dict[int, dict]:
+    results: dict[int, dict] = {}
+    pending = list(numbers)
+    for dpi in OCR_DPI_LADDER:
+        # Pages skipped at any step keep a lower-quality (or no) result, so the extraction is truncated.
+        allowed = budget.take_images(len(pending))
+        if allowed < len(pending):
+            budget.truncate("image limit")
+        pending = pending[:allowed]
+        deadline = budget.ocr_deadline()
+        if not pending or (deadline is not None and time.monotonic() >= deadline):
+            if pending:
+                budget.truncate("ocr time limit")
+            break
+
+        with stage("extraction.render"):
+            rasters = [_render_page(doc[number - 1], dpi) for number in pending]
+        with stage("extraction.ocr"):
+            recognized = ocr_images(rasters, deadline=deadline)
+        failed = set()
+        for number, result in zip(pending, recognized):
+            failure = _ocr_failure(result)
+            if failure:
+                budget.truncate(failure)
+                failed.add(number)
+                continue
+            previous = results.get(number)
+            if previous is None or result["confidence"] > previous["confidence"]:
+                results[number] = {**result, "dpi": dpi}
+        # A page whose OCR failed is not retried at a higher DPI.
+        pending = [
+            number
+            for number in pending
+            if number not in failed and number in results and results[number]["confidence"] < OCR_MIN_CONFIDENCE
+        ]
+    return results
+
+
+def _ocr_pdf(
+    doc,
+    pages: list[dict],
+    direct_pages: list[str],
+    budget: ExtractionBudget,
+    early_check: Callable[[str], bool] | None,
+) -> dict[int, dict]:
+    numbers = [page["page"] for page in pages if page["ocr"]]
+    ocr_pages: dict[int, dict] = {}
+    if early_check is not None and len(pages) > EXTRACTION_EARLY_CHECK_PAGES:
+        # Read the first pages before paying for the rest, so obvious non-resumes stop here.
+        first = [number for number in numbers if number <= EXTRACTION_EARLY_CHECK_PAGES]
+        if first and tesseract_available():
+            ocr_pages.update(_ocr_pdf_pages(doc, first, budget))
+        preview = direct_pages[:EXTRACTION_EARLY_CHECK_PAGES] + [ocr_pages[number]["text"] for number in first if number in ocr_pages]
+        if not early_check(_normalize_chunks(preview)):
+            budget.rejected_early = True
+            return ocr_pages
+        numbers = [number for number in numbers if number > EXTRACTION_EARLY_CHECK_PAGES]
+
+    if numbers and tesseract_available():
+        ocr_pages.update(_ocr_pdf_pages(doc, numbers, budget))
+    return ocr_pages
+
+
+def _pymupdf_text_layer(doc, budget: ExtractionBudget) -> tuple[list[str], list[dict]]:
+    direct_pages: list[str] = []
+    pages: list[dict] = []
+    for number, page in enumerate(doc, start=1):
+        if not budget.allows_page(number):
+            break
+        blocks = page.get_text("blocks", sort=True)
+        direct = "\n".join(block[4].strip() for block in blocks if block[6] == 0 and block[4].strip())
+        boxes = [info["bbox"] for info in page.get_image_info()]
+        direct_pages.append(direct)
+        pages.append({"page": number, **_page_ocr_decision(direct, _image_coverage(boxes, page.rect.width, page.rect.height))})
+    return direct_pages, pages
+
+
+def _extract_pdf_pymupdf(
+    source: Source, budget: ExtractionBudget, early_check: Callable[[str], bool] | None
+) -> tuple[int, list[str], list[dict], dict[int, dict]]:
+    # One document handle serves the text layer, the layout and the OCR rasters.
+    doc = _open_fitz(source)
+    try:
+        with stage("extraction.text_layer"):
+            direct_pages, pages = _pymupdf_text_layer(doc, budget)
+        ocr_pages = _ocr_pdf(doc, pages, direct_pages, budget, early_check)
+        page_count = doc.page_count
+    finally:
+        doc.close()
+
+    return page_count, direct_pages, pages, ocr_pages
+
+
+def _extract_pdf_pdfplumber(
+    source: Source, budget: ExtractionBudget, early_check: Callable[[str], bool] | None
+) -> tuple[int, list[str], list[dict], dict[int, dict]]:
     import pdfplumber
 
-    chunks: list[str] = []
-    with pdfplumber.open(io.BytesIO(data)) as pdf:
-        for page in pdf.pages:
+    direct_pages: list[str] = []
+    pages: list[dict] = []
+    with stage("extraction.text_layer"), pdfplumber.open(_as_file(source)) as pdf:
+        page_count = len(pdf.pages)
+        for number, page in enumerate(pdf.pages, start=1):
+            if not budget.allows_page(number):
+                break
             direct = (page.extract_text() or "").strip()
-            if direct:
-                chunks.append(direct)
+            boxes = [(image["x0"], image["top"], image["x1"], image["bottom"]) for image in page.images]
+            direct_pages.append(direct)
+            pages.append({"page": number, **_page_ocr_decision(direct, _image_coverage(boxes, page.width, page.height))})
+
+    ocr_pages: dict[int, dict] = {}
+    if not any(page["ocr"] for page in pages):
+        ocr_pages = _ocr_pdf(None, pages, direct_pages, budget, early_check)
+        return page_count, direct_pages, pages, ocr_pages
 
     # OCR is optional. If PyMuPDF or Tesseract is missing, keep direct extraction.
     try:
-        import fitz
+        import fitz  # noqa: F401
 
-        doc = fitz.open(stream=data, filetype="pdf")
+        doc = _open_fitz(source)
         try:
-            for page in doc:
-                pix = page.get_pixmap(matrix=fitz.Matrix(2, 2), alpha=False)
-                ocr = _optional_ocr_image_bytes(pix.tobytes("png"))
-                if ocr:
-                    chunks.append(ocr)
+            ocr_pages = _ocr_pdf(doc, pages, direct_pages, budget, early_check)
         finally:
             doc.close()
     except Exception:
         pass
 
-    return _normalize_chunks(chunks)
+    return page_count, direct_pages, pages, ocr_pages
+
+
+def extract_pdf(
+    source: Source,
+    budget: ExtractionBudget | None = None,
+    early_check: Callable[[str], bool] | None = None,
+) -> dict:
+    budget = budget or ExtractionBudget()
+    extractor = _pdf_extractor()
+    if extractor == "pymupdf":
+        page_count, direct_pages, pages, ocr_pages = _extract_pdf_pymupdf(source, budget, early_check)
+    else:
+        page_count, direct_pages, pages, ocr_pages = _extract_pdf_pdfplumber(source, budget, early_check)
+
+    chunks: list[str] = []
+    for page, direct in zip(pages, direct_pages):
+        ocr = ocr_pages.get(page["page"])
+        text, page["source"] = _reconcile_page(direct, ocr["text"] if ocr else "", page["glyph_coverage"])
+        chunks.append(text)
+        if ocr:
+            page["ocr_chars"] = len(ocr["text"])
+            page["ocr_confidence"] = ocr["confidence"]
+            page["ocr_dpi"] = ocr["dpi"]
+        elif page["ocr"] and (budget.reasons or budget.rejected_early):
+            page["ocr_skipped"] = True
+
+    ocr_requested = any(page["ocr"] for page in pages)
+    return {
+        "format": "pdf",
+        "extractor": extractor,
+        "text": _normalize_chunks(chunks),
+        "ocr_text": {str(number): ocr["text"] for number, ocr in sorted(ocr_pages.items())},
+        "ocr_available": tesseract_available() if ocr_requested else None,
+        "page_count": page_count,
+        "pages_processed": len(pages),
+        "ocr_pages": [page["page"] for page in pages if page["ocr"]],
+        "pages": pages,
+        **budget.report(),
+    }
 
 
-def extract_text_from_docx(data: bytes) -> str:
+def extract_text_from_pdf(source: Source) -> str:
+    return extract_pdf(source)["text"]
+
+
+def extract_docx(source: Source, budget: ExtractionBudget | None = None) -> dict:
     from docx import Document
 
+    budget = budget or ExtractionBudget()
     chunks: list[str] = []
-    doc = Document(io.BytesIO(data))
-    chunks.extend(paragraph.text for paragraph in doc.paragraphs if paragraph.text.strip())
+    with stage("extraction.text_layer"):
+        doc = Document(_as_file(source))
+        chunks.extend(paragraph.text for paragraph in doc.paragraphs if paragraph.text.strip())
 
     # OCR embedded images inside the DOCX archive.
-    with zipfile.ZipFile(io.BytesIO(data)) as archive:
+    images: list[bytes] = []
+    with zipfile.ZipFile(_as_file(source)) as archive:
         for name in archive.namelist():
             if not name.startswith("word/media/"):
                 continue
             if not name.lower().endswith((".png", ".jpg", ".jpeg", ".bmp", ".tiff", ".webp")):
                 continue
-            ocr = _optional_ocr_image_bytes(archive.read(name))
-            if ocr:
-                chunks.append(ocr)
+            images.append(archive.read(name))
+
+    # Without Tesseract the images are skipped, as for PDFs; ocr_available reports it.
+    ocr_ready = bool(images) and tesseract_available()
+    allowed = budget.take_images(len(images)) if ocr_ready else 0
+    if ocr_ready and allowed < len(images):
+        budget.truncate("image limit")
+    with stage("extraction.ocr"):
+        results = ocr_images(images[:allowed], deadline=budget.ocr_deadline()) if allowed else []
+    for result in results:
+        failure = _ocr_failure(result)
+        if failure:
+            budget.truncate(failure)
+    ocr_text = [result["text"] if result else "" for result in results]
+    # Screenshots of the document body would otherwise repeat paragraphs already extracted.
+    text, _ = _merge_lines(_normalize_chunks(chunks), "\n".join(ocr_text))
+    return {
+        "format": "docx",
+        "text": text,
+        "ocr_text": {str(index): text for index, text in enumerate(ocr_text, start=1)},
+        "ocr_available": tesseract_available() if images else None,
+        "ocr_images": len(images),
+        **budget.report(),
+    }
+
 
-    return _normalize_chunks(chunks)
+def extract_text_from_docx(source: Source) -> str:
+    return extract_docx(source)["text"]
 
 
-def extract_resume_text(filename: str, data: bytes) -> str:
+def extract_resume(
+    filename: str,
+    source: Source,
+    budget: ExtractionBudget | None = None,
+    early_check: Callable[[str], bool] | None = None,
+) -> dict:
     lower = filename.lower()
     if lower.endswith(".pdf"):
-        return extract_text_from_pdf(data)
+        return extract_pdf(source, budget=budget, early_check=early_check)
     if lower.endswith(".docx"):
-        return extract_text_from_docx(data)
+        return extract_docx(source, budget=budget)
     raise ValueError("Only .pdf or .docx supported")
+
+
+def extraction_report(result: dict) -> dict:
+    return {key: value for key, value in result.items() if key not in {"text", "ocr_text"}}
+
+
+def extract_resume_text(filename: str, source: Source) -> str:
+    return extract_resume(filename, source)["text"]
@@ -1,67 +1,66 @@
 import os
 
 import httpx
-from fastapi import APIRouter, Depends, File, Form, HTTPException, Query, UploadFile
-from sqlalchemy import func
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, BackgroundTasks, Depends, Form, HTTPException, Query
+from sqlalchemy import exists, or_
+from sqlalchemy.orm import Session, load_only
 
+from .analysis_cache import analysis_cache_stats, cached_compute_signals, cached_detect_resume_document
 from .db import get_db
+from .extraction_cache import get_cached_extraction, store_extraction
 from .llm_client import classify_document_with_llm, clean_resume_text_with_llm, generate_llm_review
-from .models import Resume, User
-from .nlp_pipeline import compute_signals, detect_resume_document
-from .resume_parser import extract_resume_text
+from .models import Resume, ResumeSkill, User
+from .nlp_pipeline import PIPELINE_VERSION, ResumeDocument, detect_resume_document
+from .rescore import RESCORE_BATCH_SIZE, RESCORE_WORKERS, rescore_status, run_rescore
+from .resume_parser import EXTRACTOR_VERSION, extract_resume, extraction_report
 from .schemas import ResumeSearchResponse, ResumeSearchResult
+from .search_index import fts_enabled, fts_match, fts_ranked, fts_terms, index_resume, index_resume_text, resume_summary
+from .timing import collect_timings, stage, timing_stats
+from .uploads import SpooledUpload, spool_upload
 
 
 router = APIRouter()
 
+# Long documents stop extracting when their first pages score below this as a resume.
+EARLY_REJECT_CONFIDENCE = 0.2
+
+
+def _summary(resume: Resume) -> dict:
+    # Rows are summarized when stored; the fallback only runs for rows the backfill has not reached.
+    return resume.summary_json or resume_summary(resume.nlp_json, resume.llm_json)
 
-def _serialize_resume(user: User, resume: Resume) -> ResumeSearchResult:
-    nlp = resume.nlp_json or {}
-    llm = resume.llm_json or {}
-    education = nlp.get("education", {})
-    scores = nlp.get("scores", {})
 
+def _serialize_resume(user: User, resume: Resume) -> ResumeSearchResult:
     return ResumeSearchResult(
         handle=user.handle,
         resume_id=resume.id,
         filename=resume.filename,
         uploaded_at=resume.created_at.isoformat(),
-        overall_score=float(scores.get("overall", 0.0)),
-        matched_skills=list(nlp.get("skills", {}).get("detected", [])),
-        missing_skills=list(nlp.get("keywords", {}).get("missing", [])),
-        graduated=bool(education.get("graduated", False)),
-        graduation_year=education.get("graduation_year"),
-        degrees=list(education.get("degrees", [])),
-        top_strengths=list(llm.get("top_strengths", [])),
-        top_gaps=list(llm.get("top_gaps", [])),
+        **_summary(resume),
     )
 
 
-def _latest_resume_rows(db: Session):
-    latest_per_user = (
-        db.query(Resume.user_id.label("user_id"), func.max(Resume.id).label("resume_id"))
-        .group_by(Resume.user_id)
-        .subquery()
-    )
-
+def _latest_resume_query(db: Session):
+    # Ordering by the pointer rather than Resume.id lets the database walk ix_users_latest_resume_id.
+    # Listings only read the summary; the body, nlp_json and llm_json load on access.
     return (
         db.query(User, Resume)
-        .join(latest_per_user, latest_per_user.c.user_id == User.id)
-        .join(Resume, Resume.id == latest_per_user.c.resume_id)
-        .order_by(Resume.id.desc())
-        .all()
+        .join(Resume, Resume.id == User.latest_resume_id)
+        .options(load_only(Resume.id, Resume.filename, Resume.created_at, Resume.summary_json))
+        .order_by(User.latest_resume_id.desc())
     )
 
 
+def _latest_resume_rows(db: Session):
+    return _latest_resume_query(db).all()
+
+
 def _matches_candidate_query(query: str, user: User, resume: Resume) -> bool:
     normalized_query = " ".join(query.lower().split())
     if not normalized_query:
         return False
 
-    nlp = resume.nlp_json or {}
-    identity = nlp.get("identity", {})
-    name = str(identity.get("name") or "").lower()
+    name = str(_summary(resume).get("name") or "").lower()
     handle = str(user.handle or "").lower()
 
     haystacks = [handle, name]
@@ -76,6 +75,27 @@ def _matches_candidate_query(query: str, user: User, resume: Resume) -> bool:
     return False
 
 
+def _contains_pattern(value: str) -> str:
+    escaped = value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    return f"%{escaped}%"
+
+
+def _response_nlp(nlp: dict | None, timings: dict | None) -> dict | None:
+    # Timings describe this request only, so they are never stored and a reused row's are dropped.
+    # The live dict is attached, so stages that finish after the flush still show up.
+    if nlp is None:
+        return None
+    nlp = {key: value for key, value in nlp.items() if key != "timings"}
+    if timings is not None:
+        nlp["timings"] = timings
+    return nlp
+
+
+def _plausible_resume(text: str) -> bool:
+    check = detect_resume_document(text)
+    return bool(check.get("is_resume")) or float(check.get("confidence", 0.0)) >= EARLY_REJECT_CONFIDENCE
+
+
 def _unique_handle(db: Session, base_handle: str) -> str:
     handle = base_handle
     suffix = 2
@@ -85,31 +105,76 @@ def _unique_handle(db: Session, base_handle: str) -> str:
     return handle
 
 
+# A plain def, so FastAPI runs extraction, the OCR wait, LLM calls and DB work in its threadpool
+# rather than on the event loop that serves searches.
 @router.post("/resumes/analyze")
-async def analyze_resume(
+def analyze_resume(
     target_role: str = Form("Software Engineering Intern"),
-    file: UploadFile = File(...),
+    upload: SpooledUpload = Depends(spool_upload),
+    reanalyze: bool = Query(False, description="Analyze again even if this file was already analyzed for the role"),
     db: Session = Depends(get_db),
 ):
-    data = await file.read()
-    if not file.filename:
-        raise HTTPException(400, "filename is required")
-    if not data:
-        raise HTTPException(400, "uploaded file is empty")
-
-    try:
-        text = extract_resume_text(file.filename, data)
-    except ValueError as exc:
-        raise HTTPException(400, str(exc)) from exc
-    except Exception as exc:
-        raise HTTPException(400, f"could not parse resume: {exc}") from exc
+    with collect_timings() as timings, stage("analyze.total"):
+        return _analyze_upload(target_role, upload, reanalyze, db, timings)
+
+
+def _analyze_upload(
+    target_role: str,
+    upload: SpooledUpload,
+    reanalyze: bool,
+    db: Session,
+    timings: dict | None,
+) -> dict:
+    filename = upload.filename
+    digest = upload.sha256
+    if not reanalyze:
+        previous = (
+            db.query(Resume)
+            .filter(
+                Resume.content_sha256 == digest,
+                Resume.target_role == target_role,
+                Resume.pipeline_version == PIPELINE_VERSION,
+                Resume.extractor_version == EXTRACTOR_VERSION,
+            )
+            .order_by(Resume.id.desc())
+            .first()
+        )
+        if previous:
+            return {
+                "handle": previous.user.handle,
+                "resume_id": previous.id,
+                "filename": previous.filename,
+                "nlp": _response_nlp(previous.nlp_json, timings),
+                "llm": previous.llm_json,
+                "reused": True,
+            }
 
+    with stage("extraction.cache"):
+        extraction = get_cached_extraction(digest)
+    cache_hit = extraction is not None
+    if extraction is None:
+        try:
+            with stage("extraction"):
+                extraction = extract_resume(filename, upload.path, early_check=_plausible_resume)
+        except ValueError as exc:
+            raise HTTPException(400, str(exc)) from exc
+        except Exception as exc:
+            raise HTTPException(400, f"could not parse resume: {exc}") from exc
+        with stage("extraction.cache"):
+            store_extraction(digest, extraction)
+
+    if extraction.get("rejected_early"):
+        raise HTTPException(400, "document rejected: the first pages do not look like a resume")
+
+    text = extraction["text"]
     if not text.strip():
         raise HTTPException(400, "resume text could not be extracted")
 
-    document_check = detect_resume_document(text)
+    document = ResumeDocument(text)
+    with stage("document_check"):
+        document_check = cached_detect_resume_document(document)
     if 0.35 <= float(document_check.get("confidence", 0.0)) <= 0.75:
-        llm_check = classify_document_with_llm(text, file.filename)
+        llm_check = classify_document_with_llm(text, filename)
         if llm_check.get("is_resume") is not None:
             document_check = {
                 "is_resume": bool(llm_check.get("is_resume")),
@@ -125,17 +190,21 @@ async def analyze_resume(
         reason = document_check.get("reason") or "The uploaded file does not look like a resume."
         raise HTTPException(400, f"document rejected: {reason}")
 
-    cleanup = clean_resume_text_with_llm(text, file.filename)
+    cleanup = clean_resume_text_with_llm(text, filename)
     cleaned_text = cleanup.get("clean_text") or text
     extracted_facts = cleanup.get("facts") or {}
 
-    nlp_profile = compute_signals(
-        cleaned_text,
-        target_role=target_role,
-        filename=file.filename,
-        facts=extracted_facts,
-    )
+    with stage("nlp"):
+        nlp_profile = cached_compute_signals(
+            cleaned_text,
+            target_role=target_role,
+            filename=filename,
+            facts=extracted_facts,
+            document=document,
+        )
     nlp_profile["extraction"] = {
+        **extraction_report(extraction),
+        "cache_hit": cache_hit,
         "used_llm_cleanup": bool(cleanup.get("used_llm")),
         "cleanup_source": cleanup.get("source", "stub"),
     }
@@ -146,35 +215,49 @@ async def analyze_resume(
     if not user:
         user = User(handle=_unique_handle(db, derived_handle))
         db.add(user)
-        db.flush()
+        with stage("db.flush"):
+            db.flush()
 
     llm_review = generate_llm_review(nlp_profile, text)
 
     resume = Resume(
         user_id=user.id,
-        filename=file.filename,
+        filename=filename,
+        content_sha256=digest,
+        target_role=target_role,
+        pipeline_version=PIPELINE_VERSION,
+        extractor_version=EXTRACTOR_VERSION,
         text=cleaned_text,
         nlp_json=nlp_profile,
         llm_json=llm_review,
     )
+    index_resume(resume)
     db.add(resume)
-    db.flush()
+    with stage("db.flush"):
+        db.flush()
+        # Only move the pointer forward, so a slower concurrent upload cannot replace a newer resume.
+        db.query(User).filter(
+            User.id == user.id,
+            or_(User.latest_resume_id.is_(None), User.latest_resume_id < resume.id),
+        ).update({User.latest_resume_id: resume.id}, synchronize_session="fetch")
+        index_resume_text(db, resume, user.handle)
 
     hook = os.getenv("N8N_WEBHOOK_URL", "")
     if hook:
         try:
-            httpx.post(
-                hook,
-                json={
-                    "type": "resume_analysis",
-                    "handle": user.handle,
-                    "resume_id": resume.id,
-                    "target_role": target_role,
-                    "nlp": nlp_profile,
-                    "llm": llm_review,
-                },
-                timeout=10,
-            )
+            with stage("webhook"):
+                httpx.post(
+                    hook,
+                    json={
+                        "type": "resume_analysis",
+                        "handle": user.handle,
+                        "resume_id": resume.id,
+                        "target_role": target_role,
+                        "nlp": nlp_profile,
+                        "llm": llm_review,
+                    },
+                    timeout=10,
+                )
         except Exception:
             pass
 
@@ -182,8 +265,9 @@ async def analyze_resume(
         "handle": user.handle,
         "resume_id": resume.id,
         "filename": resume.filename,
-        "nlp": nlp_profile,
+        "nlp": _response_nlp(nlp_profile, timings),
         "llm": llm_review,
+        "reused": False,
     }
 
 
@@ -193,7 +277,7 @@ def resume_latest(handle: str, db: Session = Depends(get_db)):
     if not user:
         raise HTTPException(404, "user not found")
 
-    latest = db.query(Resume).filter(Resume.user_id == user.id).order_by(Resume.id.desc()).first()
+    latest = user.latest_resume
     if not latest:
         raise HTTPException(404, "no resume uploaded")
 
@@ -206,10 +290,24 @@ def resume_latest(handle: str, db: Session = Depends(get_db)):
     }
 
 
+def _find_matches(query: str, db: Session) -> tuple[list[tuple[User, Resume]], int]:
+    if not fts_enabled(db):
+        rows = _latest_resume_rows(db)
+        matches = [(user, resume) for user, resume in rows if _matches_candidate_query(query, user, resume)]
+        return matches[:10], len(matches)
+
+    match = fts_match(fts_terms(query), columns=("name", "handle"), prefix=True)
+    if match is None:
+        return [], 0
+    fts = fts_ranked(match)
+    matched = _latest_resume_query(db).join(fts, fts.c.resume_id == Resume.id)
+    matches = matched.order_by(None).order_by(fts.c.rank, Resume.id.desc()).limit(10).all()
+    return matches, matched.order_by(None).count() if matches else 0
+
+
 @router.get("/resumes/find")
 def find_resume(query: str = Query(..., min_length=1), db: Session = Depends(get_db)):
-    rows = _latest_resume_rows(db)
-    matches = [(user, resume) for user, resume in rows if _matches_candidate_query(query, user, resume)]
+    matches, match_count = _find_matches(query, db)
     if not matches:
         raise HTTPException(404, "no matching candidate found")
 
@@ -220,14 +318,14 @@ def find_resume(query: str = Query(..., min_length=1), db: Session = Depends(get
         "filename": latest.filename,
         "nlp": latest.nlp_json,
         "llm": latest.llm_json,
-        "match_count": len(matches),
+        "match_count": match_count,
         "matches": [
             {
                 "handle": match_user.handle,
-                "name": (match_resume.nlp_json or {}).get("identity", {}).get("name"),
+                "name": _summary(match_resume).get("name"),
                 "filename": match_resume.filename,
             }
-            for match_user, match_resume in matches[:10]
+            for match_user, match_resume in matches
         ],
     }
 
@@ -238,34 +336,33 @@ def search_resumes(
     graduated: bool | None = Query(default=None),
     degree_query: str = Query("", description="Match degree names"),
     min_score: float = Query(0.0, ge=0.0, le=1.0),
+    text_query: str = Query("", description='Full-text search over resumes; words must all appear, "quoted phrases" in order'),
     limit: int = Query(25, ge=1, le=100),
     db: Session = Depends(get_db),
 ):
-    rows = _latest_resume_rows(db)
-
-    required = [skill.strip().lower() for skill in required_skills.split(",") if skill.strip()]
+    required = list(dict.fromkeys(skill.strip().lower() for skill in required_skills.split(",") if skill.strip()))
     degree_query_norm = degree_query.strip().lower()
-    results = []
-
-    for user, resume in rows:
-        nlp = resume.nlp_json or {}
-        skills = [skill.lower() for skill in nlp.get("skills", {}).get("detected", [])]
-        education = nlp.get("education", {})
-        degrees = [degree.lower() for degree in education.get("degrees", [])]
-        overall_score = float(nlp.get("scores", {}).get("overall", 0.0))
-
-        if required and not all(skill in skills for skill in required):
-            continue
-        if graduated is not None and bool(education.get("graduated", False)) != graduated:
-            continue
-        if degree_query_norm and not any(degree_query_norm in degree for degree in degrees):
-            continue
-        if overall_score < min_score:
-            continue
-
-        results.append(_serialize_resume(user, resume))
-        if len(results) >= limit:
-            break
+    terms = fts_terms(text_query)
+
+    query = _latest_resume_query(db)
+    for skill in required:
+        query = query.filter(exists().where(ResumeSkill.resume_id == Resume.id, ResumeSkill.skill == skill))
+    if graduated is not None:
+        query = query.filter(Resume.graduated == graduated)
+    if degree_query_norm:
+        # Degrees are stored as "|bachelor|master|"; "|" never appears inside a degree name.
+        query = query.filter(Resume.degrees.like(_contains_pattern(degree_query_norm), escape="\\"))
+    if min_score > 0:
+        query = query.filter(Resume.overall_score >= min_score)
+    if terms:
+        if fts_enabled(db):
+            fts = fts_ranked(fts_match(terms))
+            query = query.join(fts, fts.c.resume_id == Resume.id).order_by(None).order_by(fts.c.rank, Resume.id.desc())
+        else:
+            for term in terms:
+                query = query.filter(Resume.text.ilike(_contains_pattern(term), escape="\\"))
+
+    results = [_serialize_resume(user, resume) for user, resume in query.limit(limit).all()]
 
     return ResumeSearchResponse(
         total=len(results),
@@ -274,7 +371,31 @@ def search_resumes(
             "graduated": graduated,
             "degree_query": degree_query_norm or None,
             "min_score": min_score,
+            "text_query": text_query.strip() or None,
             "limit": limit,
         },
         results=results,
     )
+
+
+@router.get("/admin/stats")
+def admin_stats():
+    return {"analysis_cache": analysis_cache_stats(), "timings": timing_stats()}
+
+
+@router.get("/admin/rescore")
+def get_rescore_status():
+    return rescore_status()
+
+
+@router.post("/admin/rescore", status_code=202)
+def start_rescore(
+    background_tasks: BackgroundTasks,
+    workers: int = Query(RESCORE_WORKERS, ge=1, le=32),
+    batch_size: int = Query(RESCORE_BATCH_SIZE, ge=1, le=10000),
+    restart: bool = Query(False, description="Ignore the checkpoint of an interrupted run"),
+):
+    if rescore_status().get("running"):
+        raise HTTPException(409, "a rescore job is already running")
+    background_tasks.add_task(run_rescore, batch_size=batch_size, workers=workers, restart=restart)
+    return {"status": "started"}
@@ -0,0 +1,70 @@
+from typing import Iterable, Sequence
+
+import numpy as np
+
+
+SCORE_WEIGHTS = {"ats": 0.35, "impact": 0.25, "clarity": 0.25, "evidence": 0.15}
+# Clarity: base + (short-bullet step if the average bullet is short) + (verb step if enough bullets start with a verb).
+CLARITY_BASE = 0.4
+CLARITY_MAX_AVG_WORDS = 22
+CLARITY_MIN_VERB_SHARE = 0.4
+CLARITY_STEPS = (0.3, 0.1)  # (condition met, condition missed)
+# Evidence: (present, missing) credit per link type.
+EVIDENCE_LINKS = {"has_github": (0.5, 0.2), "has_linkedin": (0.3, 0.1), "has_portfolio": (0.2, 0.0)}
+FEATURE_COLUMNS = (
+    "bullet_count",
+    "bullet_words",
+    "bullets_with_numbers",
+    "verb_first",
+    "has_github",
+    "has_linkedin",
+    "has_portfolio",
+    "keyword_hits",
+    "keyword_total",
+)
+SCORE_COLUMNS = ("ats", "impact", "clarity", "evidence", "overall")
+
+
+def features_to_columns(rows: Iterable[dict]) -> dict[str, list]:
+    columns = {name: [] for name in FEATURE_COLUMNS}
+    for row in rows:
+        for name in FEATURE_COLUMNS:
+            columns[name].append(row.get(name) or 0)
+    return columns
+
+
+def score_batch(columns: dict[str, Sequence]) -> dict[str, list[float]]:
+    """Score resumes given as FEATURE_COLUMNS arrays; returns one rounded list per score.
+
+    Uploads (a batch of one) and the rescore job go through this same code, so their scores agree.
+    """
+    column = {name: np.asarray(columns[name], dtype=np.float64) for name in FEATURE_COLUMNS}
+    bullet_count = column["bullet_count"]
+    divisor = np.maximum(1.0, bullet_count)
+    avg_words = np.where(bullet_count > 0, column["bullet_words"] / divisor, 0.0)
+    verb_share = column["verb_first"] / divisor
+    met, missed = CLARITY_STEPS
+    clarity = np.minimum(
+        1.0,
+        CLARITY_BASE
+        + np.where(avg_words <= CLARITY_MAX_AVG_WORDS, met, missed)
+        + np.where(verb_share >= CLARITY_MIN_VERB_SHARE, met, missed),
+    )
+    impact = np.minimum(1.0, column["bullets_with_numbers"] / divisor)
+    evidence = np.zeros(len(bullet_count))
+    for name, (present, missing) in EVIDENCE_LINKS.items():
+        evidence = evidence + np.where(column[name] > 0, present, missing)
+    evidence = np.minimum(1.0, evidence)
+    # ATS is rounded before it is weighted.
+    ats = np.round(column["keyword_hits"] / np.maximum(1.0, column["keyword_total"]), 3)
+    values = {"ats": ats, "impact": impact, "clarity": clarity, "evidence": evidence}
+    overall = np.zeros(len(bullet_count))
+    for name, weight in SCORE_WEIGHTS.items():
+        overall = overall + weight * values[name]
+    values["overall"] = overall
+    return {name: np.round(values[name], 3).tolist() for name in SCORE_COLUMNS}
+
+
+def score_features(features: dict) -> dict[str, float]:
+    scores = score_batch(features_to_columns([features]))
+    return {name: values[0] for name, values in scores.items()}
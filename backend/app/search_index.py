@@ -0,0 +1,155 @@
+import re
+from functools import lru_cache
+
+from sqlalchemy import Float, Integer, text
+
+from .models import Resume, ResumeSkill
+
+
+FTS_TABLE = "resume_fts"
+FTS_COLUMNS = ("name", "handle", "email", "filename", "body")
+# Contentless: the table only stores the index, the text itself stays in resumes.
+FTS_CREATE = (
+    f"CREATE VIRTUAL TABLE {FTS_TABLE} USING fts5({', '.join(FTS_COLUMNS)}, "
+    "content='', tokenize='unicode61 remove_diacritics 2')"
+)
+# bm25 weights in FTS_COLUMNS order; a hit in the name or handle outranks one in the body.
+FTS_WEIGHTS = (10.0, 10.0, 5.0, 2.0, 1.0)
+FTS_TERM_RE = re.compile(r'"([^"]*)"|(\w+)')
+
+
+def _degrees_value(degrees: list[str]) -> str | None:
+    # Delimited on both sides so a single degree can be matched with LIKE '%|name|%'.
+    return f"|{'|'.join(degrees)}|" if degrees else None
+
+
+def _year(value) -> int | None:
+    try:
+        return int(value) if value is not None else None
+    except (TypeError, ValueError):
+        return None
+
+
+def search_columns(nlp: dict | None) -> dict:
+    """Searchable Resume columns derived from an NLP profile."""
+    nlp = nlp or {}
+    education = nlp.get("education", {})
+    degrees = [str(degree).strip().lower() for degree in education.get("degrees", []) if str(degree).strip()]
+    return {
+        "degrees": _degrees_value(list(dict.fromkeys(degrees))),
+        "graduated": bool(education.get("graduated", False)),
+        "graduation_year": _year(education.get("graduation_year")),
+        "overall_score": float(nlp.get("scores", {}).get("overall", 0.0)),
+    }
+
+
+def resume_skill_names(nlp: dict | None) -> list[str]:
+    detected = (nlp or {}).get("skills", {}).get("detected", [])
+    return list(dict.fromkeys(str(skill).strip().lower() for skill in detected if str(skill).strip()))
+
+
+def resume_summary(nlp: dict | None, llm: dict | None) -> dict:
+    """The ResumeSearchResult fields that come from the NLP profile and the LLM review."""
+    nlp = nlp or {}
+    llm = llm or {}
+    education = nlp.get("education", {})
+    scores = nlp.get("scores", {})
+    return {
+        "name": nlp.get("identity", {}).get("name"),
+        "overall_score": float(scores.get("overall", 0.0)),
+        "clarity_score": float(scores.get("clarity", 0.0)),
+        "matched_skills": list(nlp.get("skills", {}).get("detected", [])),
+        "missing_skills": list(nlp.get("keywords", {}).get("missing", [])),
+        "graduated": bool(education.get("graduated", False)),
+        "graduation_year": education.get("graduation_year"),
+        "degrees": list(education.get("degrees", [])),
+        "top_strengths": list(llm.get("top_strengths", [])),
+        "top_gaps": list(llm.get("top_gaps", [])),
+    }
+
+
+def index_resume(resume: Resume) -> None:
+    """Materialize the searchable facts of ``resume.nlp_json`` before the resume is flushed."""
+    for column, value in search_columns(resume.nlp_json).items():
+        setattr(resume, column, value)
+    resume.summary_json = resume_summary(resume.nlp_json, resume.llm_json)
+    resume.skills = [ResumeSkill(skill=skill) for skill in resume_skill_names(resume.nlp_json)]
+
+
+def fts_row(resume_id: int, handle: str, filename: str | None, body: str | None, nlp: dict | None) -> dict:
+    identity = (nlp or {}).get("identity", {})
+    return {
+        "rowid": resume_id,
+        "name": identity.get("name") or "",
+        "handle": handle or "",
+        "email": identity.get("email") or "",
+        "filename": filename or "",
+        "body": body or "",
+    }
+
+
+def fts_insert_statement():
+    return text(
+        f"INSERT INTO {FTS_TABLE} (rowid, {', '.join(FTS_COLUMNS)}) "
+        f"VALUES (:rowid, {', '.join(':' + column for column in FTS_COLUMNS)})"
+    )
+
+
+@lru_cache(maxsize=None)
+def _fts_available(engine) -> bool:
+    if engine.dialect.name != "sqlite":
+        return False
+    with engine.connect() as connection:
+        found = connection.execute(
+            text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = :name"), {"name": FTS_TABLE}
+        ).first()
+    return found is not None
+
+
+def fts_enabled(db) -> bool:
+    """True when the database has the full-text table (SQLite built with FTS5)."""
+    return _fts_available(db.get_bind())
+
+
+def index_resume_text(db, resume: Resume, handle: str) -> None:
+    """Add a flushed resume to the full-text index; a no-op without FTS5."""
+    if fts_enabled(db):
+        db.execute(
+            fts_insert_statement(),
+            fts_row(resume.id, handle, resume.filename, resume.text, resume.nlp_json),
+        )
+
+
+def fts_terms(query: str) -> list[str]:
+    """Split a query into words and "quoted phrases"."""
+    terms = []
+    for phrase, word in FTS_TERM_RE.findall(query):
+        term = " ".join(phrase.split()) if phrase else word
+        if term:
+            terms.append(term)
+    return terms
+
+
+def fts_match(terms: list[str], columns: tuple[str, ...] = (), prefix: bool = False) -> str | None:
+    """Build an FTS5 MATCH expression requiring every term; terms are quoted so user input is never FTS syntax."""
+    if not terms:
+        return None
+    suffix = "*" if prefix else ""
+    expression = " AND ".join(f'"{term}"{suffix}' for term in terms)
+    if columns:
+        expression = f"{{{' '.join(columns)}}} : ({expression})"
+    return expression
+
+
+def fts_ranked(match: str):
+    """Subquery of (resume_id, rank) for resumes matching ``match``; lower rank is a better bm25 match."""
+    weights = ", ".join(str(weight) for weight in FTS_WEIGHTS)
+    return (
+        text(
+            f"SELECT rowid AS resume_id, bm25({FTS_TABLE}, {weights}) AS rank "
+            f"FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH :match"
+        )
+        .bindparams(match=match)
+        .columns(resume_id=Integer, rank=Float)
+        .subquery("fts")
+    )
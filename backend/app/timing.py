@@ -0,0 +1,99 @@
+import os
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager, nullcontext
+from contextvars import ContextVar
+from functools import wraps
+from typing import Iterator
+
+
+STAGE_TIMINGS = os.getenv("STAGE_TIMINGS", "0").lower() in {"1", "true", "yes"}
+# Histogram bucket upper bounds in milliseconds; the last bucket catches everything slower.
+TIMING_BUCKETS_MS = (1, 2, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000, 30000, 60000)
+
+_request_timings: ContextVar[dict | None] = ContextVar("request_timings", default=None)
+_histograms: dict[str, dict] = {}
+_histograms_lock = threading.Lock()
+_disabled = nullcontext()
+
+
+def _record(name: str, elapsed_ms: float) -> None:
+    timings = _request_timings.get()
+    if timings is not None:
+        timings[name] = round(timings.get(name, 0.0) + elapsed_ms, 3)
+
+    with _histograms_lock:
+        histogram = _histograms.get(name)
+        if histogram is None:
+            histogram = _histograms[name] = {
+                "count": 0,
+                "total_ms": 0.0,
+                "max_ms": 0.0,
+                "buckets": [0] * (len(TIMING_BUCKETS_MS) + 1),
+            }
+        histogram["count"] += 1
+        histogram["total_ms"] += elapsed_ms
+        histogram["max_ms"] = max(histogram["max_ms"], elapsed_ms)
+        histogram["buckets"][bisect_left(TIMING_BUCKETS_MS, elapsed_ms)] += 1
+
+
+class _Stage:
+    __slots__ = ("name", "started")
+
+    def __init__(self, name: str):
+        self.name = name
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        _record(self.name, (time.perf_counter() - self.started) * 1000)
+        return False
+
+
+def stage(name: str):
+    """Time a block as ``name``; a shared no-op context manager when STAGE_TIMINGS is off."""
+    return _Stage(name) if STAGE_TIMINGS else _disabled
+
+
+def timed(name: str):
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            with stage(name):
+                return func(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+@contextmanager
+def collect_timings() -> Iterator[dict | None]:
+    """Collect the stage timings of the current request into a dict (None when timings are off)."""
+    if not STAGE_TIMINGS:
+        yield None
+        return
+    token = _request_timings.set({})
+    try:
+        yield _request_timings.get()
+    finally:
+        _request_timings.reset(token)
+
+
+def timing_stats() -> dict:
+    with _histograms_lock:
+        stages = {}
+        for name, histogram in sorted(_histograms.items()):
+            count = histogram["count"]
+            labels = [f"<={bound}ms" for bound in TIMING_BUCKETS_MS] + [f">{TIMING_BUCKETS_MS[-1]}ms"]
+            stages[name] = {
+                "count": count,
+                "total_ms": round(histogram["total_ms"], 3),
+                "mean_ms": round(histogram["total_ms"] / count, 3) if count else 0.0,
+                "max_ms": round(histogram["max_ms"], 3),
+                "buckets": {label: value for label, value in zip(labels, histogram["buckets"]) if value},
+            }
+    return {"enabled": STAGE_TIMINGS, "stages": stages}
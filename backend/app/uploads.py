@@ -0,0 +1,86 @@
+import hashlib
+import os
+import tempfile
+from typing import AsyncIterator, NamedTuple
+
+from fastapi import File, HTTPException, UploadFile
+from fastapi.responses import JSONResponse
+
+
+MAX_UPLOAD_BYTES = int(os.getenv("MAX_UPLOAD_BYTES", str(25 * 1024 * 1024)))
+UPLOAD_CHUNK_BYTES = 1024 * 1024
+UPLOAD_LIMITED_PATHS = ("/resumes/analyze",)
+
+
+class UploadTooLarge(HTTPException):
+    def __init__(self) -> None:
+        super().__init__(413, f"uploaded file exceeds the {MAX_UPLOAD_BYTES} byte limit")
+
+
+class SpooledUpload(NamedTuple):
+    filename: str
+    path: str
+    size: int
+    sha256: str
+
+
+class UploadLimitMiddleware:
+    """Reject oversized request bodies before they are buffered by the multipart parser."""
+
+    def __init__(self, app, max_bytes: int = MAX_UPLOAD_BYTES, paths: tuple[str, ...] = UPLOAD_LIMITED_PATHS):
+        self.app = app
+        self.max_bytes = max_bytes
+        self.paths = paths
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope.get("method") != "POST" or scope.get("path") not in self.paths:
+            await self.app(scope, receive, send)
+            return
+
+        declared = dict(scope.get("headers") or []).get(b"content-length", b"")
+        if declared.isdigit() and int(declared) > self.max_bytes:
+            response = JSONResponse({"detail": UploadTooLarge().detail}, status_code=413)
+            await response(scope, receive, send)
+            return
+
+        received = 0
+
+        async def limited_receive():
+            nonlocal received
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > self.max_bytes:
+                    raise UploadTooLarge()
+            return message
+
+        await self.app(scope, limited_receive, send)
+
+
+async def spool_upload(file: UploadFile = File(...)) -> AsyncIterator[SpooledUpload]:
+    """Stream an upload into a temp file, hashing it on the way, and remove the file afterwards."""
+    if not file.filename:
+        raise HTTPException(400, "filename is required")
+
+    suffix = os.path.splitext(file.filename)[1].lower()
+    digest = hashlib.sha256()
+    size = 0
+    handle = tempfile.NamedTemporaryFile(prefix="internos_upload_", suffix=suffix, delete=False)
+    try:
+        with handle:
+            while chunk := await file.read(UPLOAD_CHUNK_BYTES):
+                size += len(chunk)
+                if size > MAX_UPLOAD_BYTES:
+                    raise UploadTooLarge()
+                digest.update(chunk)
+                handle.write(chunk)
+        await file.close()
+        if not size:
+            raise HTTPException(400, "uploaded file is empty")
+
+        yield SpooledUpload(filename=file.filename, path=handle.name, size=size, sha256=digest.hexdigest())
+    finally:
+        try:
+            os.unlink(handle.name)
+        except OSError:
+            pass
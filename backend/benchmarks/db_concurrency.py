@@ -0,0 +1,144 @@
+"""Concurrent read/write throughput of the SQLite database, with and without the db.py tuning profile.
+
+Worker processes stand in for uvicorn workers: writers store resumes the way an upload does, readers
+run the /resumes/search query. Run from the backend directory:
+
+    python -m benchmarks.db_concurrency --writers 2 --readers 4 --seconds 10
+"""
+
+import argparse
+import os
+import random
+import tempfile
+import time
+from multiprocessing import get_context
+
+from sqlalchemy import or_
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import sessionmaker
+
+from app.db import Base, make_engine
+from app.migrations import run_migrations
+from app.models import Resume, User
+from app.search_index import index_resume, index_resume_text
+
+BODY = " ".join(
+    "Built data pipelines in Python and SQL, deployed services with Docker on AWS, improved latency by 30%."
+    for _ in range(40)
+)
+
+
+def _profile(index: int) -> dict:
+    return {
+        "identity": {"name": f"Candidate {index}"},
+        "skills": {"detected": random.sample(["python", "sql", "docker", "aws", "react", "java"], 3)},
+        "education": {"degrees": ["bachelor"], "graduated": index % 2 == 0, "graduation_year": 2024},
+        "scores": {"overall": round(random.random(), 3), "clarity": 0.5},
+    }
+
+
+def _add_resume(session, index: int) -> None:
+    user = User(handle=f"candidate-{os.getpid()}-{index}")
+    session.add(user)
+    session.flush()
+    resume = Resume(user_id=user.id, filename="resume.pdf", text=BODY, nlp_json=_profile(index), llm_json={})
+    index_resume(resume)
+    session.add(resume)
+    session.flush()
+    session.query(User).filter(
+        User.id == user.id,
+        or_(User.latest_resume_id.is_(None), User.latest_resume_id < resume.id),
+    ).update({User.latest_resume_id: resume.id}, synchronize_session=False)
+    index_resume_text(session, resume, user.handle)
+    session.commit()
+
+
+def _search(session) -> None:
+    (
+        session.query(User, Resume)
+        .join(Resume, Resume.id == User.latest_resume_id)
+        .filter(Resume.overall_score >= 0.5)
+        .order_by(User.latest_resume_id.desc())
+        .limit(25)
+        .all()
+    )
+
+
+def _worker(role: str, database_url: str, tuned: bool, seconds: float, results) -> None:
+    engine = make_engine(database_url, tuned=tuned)
+    Session = sessionmaker(bind=engine, autoflush=False, future=True)
+    operations = errors = 0
+    deadline = time.monotonic() + seconds
+    while time.monotonic() < deadline:
+        with Session() as session:
+            try:
+                if role == "write":
+                    _add_resume(session, operations)
+                else:
+                    _search(session)
+                operations += 1
+            except OperationalError:
+                session.rollback()
+                errors += 1
+    engine.dispose()
+    results.put((role, operations, errors))
+
+
+def run(database_url: str, tuned: bool, writers: int, readers: int, seconds: float) -> dict:
+    context = get_context("spawn")
+    results = context.Queue()
+    workers = [
+        context.Process(target=_worker, args=(role, database_url, tuned, seconds, results))
+        for role in ["write"] * writers + ["read"] * readers
+    ]
+    for worker in workers:
+        worker.start()
+    totals = {"write": [0, 0], "read": [0, 0]}
+    for _ in workers:
+        role, operations, errors = results.get()
+        totals[role][0] += operations
+        totals[role][1] += errors
+    for worker in workers:
+        worker.join()
+    return {
+        "writes_per_second": round(totals["write"][0] / seconds, 1),
+        "reads_per_second": round(totals["read"][0] / seconds, 1),
+        "locked_errors": totals["write"][1] + totals["read"][1],
+    }
+
+
+def _prepare(path: str, seed_rows: int) -> str:
+    database_url = f"sqlite:///{path}"
+    engine = make_engine(database_url, tuned=False)
+    Base.metadata.create_all(bind=engine)
+    run_migrations(engine)
+    Session = sessionmaker(bind=engine, autoflush=False, future=True)
+    with Session() as session:
+        for index in range(seed_rows):
+            _add_resume(session, index)
+    engine.dispose()
+    return database_url
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Benchmark concurrent SQLite reads and writes.")
+    parser.add_argument("--writers", type=int, default=2, help="writer processes")
+    parser.add_argument("--readers", type=int, default=4, help="reader processes")
+    parser.add_argument("--seconds", type=float, default=10.0, help="duration of each run")
+    parser.add_argument("--seed-rows", type=int, default=2000, help="resumes stored before each run")
+    args = parser.parse_args(argv)
+
+    random.seed(7)
+    for label, tuned in (("default", False), ("tuned", True)):
+        with tempfile.TemporaryDirectory() as directory:
+            database_url = _prepare(os.path.join(directory, "bench.db"), args.seed_rows)
+            result = run(database_url, tuned, args.writers, args.readers, args.seconds)
+        print(
+            f"{label:>8}: {result['writes_per_second']} writes/s, {result['reads_per_second']} reads/s, "
+            f"{result['locked_errors']} 'database is locked' errors",
+            flush=True,
+        )
+
+
+if __name__ == "__main__":
+    main()